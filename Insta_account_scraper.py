@@ -1,131 +1,177 @@
+import argparse
 import instaloader
-import pandas as pd
-import time
-import random
-import re
-import gspread
 import os
-import json
-from oauth2client.service_account import ServiceAccountCredentials
-from datetime import datetime
+from datetime import datetime, timedelta
+from google_sheets import get_google_sheet
+from scrape_scheduler import ProfileScheduler, DEFAULT_RATE_PER_MINUTE, DEFAULT_WORKERS, DEFAULT_DEADLINE_MINUTES
+from sheet_writer import BufferedSheetWriter, DEFAULT_BATCH_SIZE, DEFAULT_FLUSH_SECONDS, extend_header
+from run_state import RunState, read_head_rows, read_today_block, urls_on, DEFAULT_STATE_FILE
+from snapshot_store import INSTA_ROW_COLUMNS, append_insta_rows, bump_version
+from aggregates import update_aggregates
+from account_registry import (DEFAULT_ACCOUNTS_FILE, load_accounts, parse_shard, select_shard,
+                              due_accounts, session_id_for)
+from scrape_policy import (DEFAULT_HISTORY_DAYS, MAX_INTERVAL_DAYS, adaptive_intervals, history_frame,
+                           last_scraped_dates)
+from run_report import RunReport, DEFAULT_REPORT_DIR
 
 # ================= CONFIGURATION =================
 SHEET_ID = "1mUEIohJzfZj_MtmYpn5E3URnw9ykfHErd5dfoZVnNSo"
-
-insta_urls = [
-    "https://www.instagram.com/ybbalkan/", "https://www.instagram.com/tsvweilimdorf/",
-    "https://www.instagram.com/tsg1846_futsal/", "https://www.instagram.com/fcg.futsal/",
-    "https://www.instagram.com/preussen06futsal/", "https://www.instagram.com/mchfutsalclub/",
-    "https://www.instagram.com/futsaliciousessen/", "https://www.instagram.com/wuppertaler_sv_futsal/",
-    "https://www.instagram.com/ffmg07_furious_futsal/", "https://www.instagram.com/futsalpantherskoeln/",
-    "https://www.instagram.com/karlsruherscfutsal/", "https://www.instagram.com/jahnfutsal/",
-    "https://www.instagram.com/fcregensburg/", "https://www.instagram.com/futsal_munich_tsv_neuried/",
-    "https://www.instagram.com/fc.liria.1985.futsal/", "https://www.instagram.com/ufk08/",
-    "https://www.instagram.com/eintrachtsuedring.futsal/", "https://www.instagram.com/spbarrio96/",
-    "https://www.instagram.com/fcstpfutsal/", "https://www.instagram.com/futsal_hamburg/",
-    "https://www.instagram.com/h96futsal/", "https://www.instagram.com/futsalnbg/",
-    "https://www.instagram.com/hot05futsal/", "https://www.instagram.com/osc_04_futsal/",
-    "https://www.instagram.com/hsvfutsal/", "https://www.instagram.com/asc_futsal/",
-    "https://www.instagram.com/sv_pars/", "https://www.instagram.com/sv98_futsal/",
-    "https://www.instagram.com/futsal_allgaeu/", "https://www.instagram.com/fc_niederrhein_soccer_futsal/",
-    "https://www.instagram.com/sf_doenbergfutsal/", "https://www.instagram.com/betonboysmunchen.e.v/",
-    "https://www.instagram.com/futsal.tvherbeck/", "https://www.instagram.com/futsalfalken/",
-    "https://www.instagram.com/fc_mattheck_moers/", "https://www.instagram.com/blunited.futsal/",
-    "https://www.instagram.com/alemanniaaachen_futsal/", "https://www.instagram.com/mitteldeutscher_futsalclub/",
-    "https://www.instagram.com/fussball.gtsvffm1908/", "https://www.instagram.com/pcfmuelheim/",
-    "https://www.instagram.com/holzpfostenschwerte/", "https://www.instagram.com/nk_zagreb_dortmund_futsal/",
-    "https://www.instagram.com/alhuda98.futsal/", "https://www.instagram.com/rsc.futsal/",
-    "https://www.instagram.com/ljiljanihamburg/", "https://www.instagram.com/gsvduisburg/",
-    "https://www.instagram.com/croatia.hamburg.futsal/", "https://www.instagram.com/blackforestfutsal/",
-    "https://www.instagram.com/afgbergstrasse/", "https://www.instagram.com/futsalclubfrankfurt/",
-    "https://www.instagram.com/futsalclubbiberach/", "https://www.instagram.com/futsalclubusora/",
-    "https://www.instagram.com/gsvaugsburg1934/", "https://www.instagram.com/atleticoerlangen/",
-     "https://www.instagram.com/futsal_dragons_augsburg/",
-    "https://www.instagram.com/dfb.futsal/", "https://www.instagram.com/dfb.u19.futsal.westfalen/",
-    "https://www.instagram.com/mister.futsal/", "https://www.instagram.com/futsalthueringen/",
-    "https://www.instagram.com/team.dfbfutsal.schiedsrichter/"
-]
-
-def get_google_sheet():
-    scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-    creds_json = os.getenv("GOOGLE_SHEETS_CREDS")
-    if creds_json:
-        creds_dict = json.loads(creds_json)
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-    else:
-        local_path = r"C:\Users\Daniel\Dropbox\Mister Futsal\User-Auswertung\futsal-instagram-stats-credentioals.json"
-        creds = ServiceAccountCredentials.from_json_keyfile_name(local_path, scope)
-    client = gspread.authorize(creds)
-    return client.open_by_key(SHEET_ID).sheet1
-
-def extract_username(url):
-    match = re.search(r"instagram\.com/([^/?]+)", url)
-    return match.group(1) if match else None
-
-# --- SCRAPING PROZESS ---
-print(f"[{datetime.now().strftime('%H:%M:%S')}] Starte Scraper...")
-
-try:
-    sheet = get_google_sheet()
-    all_data = sheet.get_all_records()
-    df_cloud = pd.DataFrame(all_data)
-    today_date = datetime.now().strftime("%Y-%m-%d")
-    urls_already_done_today = []
-
-    if not df_cloud.empty:
-        df_cloud.columns = [str(c).strip().upper() for c in df_cloud.columns]
-        if 'DATE' in df_cloud.columns:
-            df_today = df_cloud[df_cloud['DATE'].astype(str).str.strip() == today_date]
-            urls_already_done_today = df_today['URL'].str.strip().tolist()
-
-    urls_to_scrape = [url for url in insta_urls if url.strip() not in urls_already_done_today]
-
-    print(f"ℹ️ Gesamt: {len(insta_urls)} | Heute bereits erledigt: {len(urls_already_done_today)}")
-    print(f"🚀 Verbleibende Abrufe: {len(urls_to_scrape)}")
-
-    if not urls_to_scrape:
-        print("✅ Alles aktuell.")
-    else:
-        L = instaloader.Instaloader()
-        session_id = os.getenv("INSTAGRAM_SESSION_ID")
+# Gesamtbudget für Profilabrufe (pro Minute, über alle Worker) und Anzahl paralleler Worker
+RATE_PER_MINUTE = float(os.getenv("SCRAPE_RATE_PER_MIN", DEFAULT_RATE_PER_MINUTE))
+WORKERS = int(os.getenv("SCRAPE_WORKERS", DEFAULT_WORKERS))
+# Zeitlimit für die Abrufphase (Minuten, 0 = keins) – Snapshot und Sortierung laufen danach noch
+DEADLINE_MINUTES = float(os.getenv("SCRAPE_DEADLINE_MINUTES", DEFAULT_DEADLINE_MINUTES))
+# Zeilen werden gebündelt geschrieben: spätestens alle N Zeilen oder T Sekunden
+BATCH_SIZE = int(os.getenv("SHEET_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+FLUSH_SECONDS = float(os.getenv("SHEET_FLUSH_SECONDS", DEFAULT_FLUSH_SECONDS))
+# Lokaler Checkpoint (letztes Scrape-Datum pro URL)
+STATE_FILE = os.getenv("SCRAPE_STATE_FILE", DEFAULT_STATE_FILE)
+# Account-Register (URL, Priorität, Abrufhäufigkeit)
+ACCOUNTS_FILE = os.getenv("ACCOUNTS_FILE", DEFAULT_ACCOUNTS_FILE)
+# Ruhige Accounts seltener abrufen (0 = alle täglich bzw. nach FREQUENCY_DAYS)
+ADAPTIVE = os.getenv("SCRAPE_ADAPTIVE", "1") != "0"
+HISTORY_DAYS = int(os.getenv("SCRAPE_HISTORY_DAYS", DEFAULT_HISTORY_DAYS))
+# Laufbericht (JSON) pro Lauf, leer = keiner
+REPORT_DIR = os.getenv("SCRAPE_REPORT_DIR", DEFAULT_REPORT_DIR)
+
+def shard_state_file(path, index, count):
+    # Jeder Shard führt seinen eigenen Checkpoint (parallele Runner auf einem Rechner)
+    if count == 1:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.shard{index}of{count}{ext}"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Instagram-Follower der Vereine abrufen und ins Sheet schreiben.")
+    parser.add_argument("--shard", default="1/1",
+                        help="Nur Teilmenge i von N der Accounts abrufen, z. B. 2/3 (Standard: 1/1 = alle)")
+    parser.add_argument("--accounts", default=ACCOUNTS_FILE, help="Pfad zum Account-Register (CSV)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    shard_index, shard_count = parse_shard(args.shard)
+    shard_label = f" (Shard {shard_index}/{shard_count})" if shard_count > 1 else ""
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] Starte Scraper{shard_label}...")
+
+    report = RunReport(REPORT_DIR, label=f"shard{shard_index}of{shard_count}" if shard_count > 1 else "",
+                       config={"shard": args.shard, "rate_per_minute": RATE_PER_MINUTE, "workers": WORKERS,
+                               "batch_size": BATCH_SIZE, "adaptive": ADAPTIVE})
+
+    try:
+        with report.phase("setup"):
+            accounts = select_shard(load_accounts(args.accounts), shard_index, shard_count)
+            with report.sheets_call("open"):
+                # Alle weiteren Sheets-Aufrufe (lesen, einfügen, sortieren) landen mit Dauer im Bericht
+                sheet = report.timed_sheet(get_google_sheet(SHEET_ID))
+            today_date = datetime.now().strftime("%Y-%m-%d")
+
+            # Nur die letzten Wochen am Kopf des Sheets lesen statt der kompletten Historie.
+            # Der heutige Block enthält auch die Zeilen der anderen Shards – nichts wird doppelt geschrieben.
+            since_date = (datetime.now() - timedelta(days=HISTORY_DAYS if ADAPTIVE else 0)).strftime("%Y-%m-%d")
+            header, recent_rows = read_head_rows(sheet, since_date)
+            # Spalten für die Profil-Kennzahlen hinter URL anlegen (einmalig, ältere Zeilen bleiben leer)
+            header = extend_header(sheet, header, INSTA_ROW_COLUMNS)
+            sheet_rows_today = urls_on(header, recent_rows, today_date)
+            state = RunState(shard_state_file(STATE_FILE, shard_index, shard_count))
+            state.reconcile(sheet_rows_today, today_date)
+            urls_already_done_today = state.done_on(today_date)
+
+            intervals = {}
+            last_scraped = dict(state.last_scraped)
+            if ADAPTIVE:
+                history = history_frame(header, recent_rows)
+                intervals = adaptive_intervals(history)
+                # Das Sheet kennt auch Läufe, die kein lokaler Checkpoint gesehen hat
+                for url, day in last_scraped_dates(history).items():
+                    last_scraped[url] = max(day, last_scraped.get(url, ""))
+                slower = sum(intervals.get(a.url, 1) > 1 for a in accounts)
+                print(f"📉 Adaptiv: {slower} ruhige Accounts werden nur alle 2–{MAX_INTERVAL_DAYS} Tage abgerufen.")
+
+            accounts_due = due_accounts(accounts, last_scraped, today_date, intervals)
+            report.config.update(accounts=len(accounts), accounts_due=len(accounts_due))
+
+        print(f"ℹ️ Gesamt: {len(accounts)} | Heute bereits erledigt: "
+              f"{sum(a.url in urls_already_done_today for a in accounts)} | "
+              f"Heute nicht fällig: {len(accounts) - len(accounts_due)}")
+        print(f"🚀 Verbleibende Abrufe: {len(accounts_due)}")
+
+        if not accounts_due:
+            print("✅ Alles aktuell.")
+            return
+
+        session_id = session_id_for(shard_index if shard_count > 1 else None)
         if session_id:
-            L.context._session.cookies.set("sessionid", session_id)
             print("✅ Login via Session-ID erfolgreich.")
         else:
             print("⚠️ Keine Session-ID gefunden!")
 
-        for i, url in enumerate(urls_to_scrape, 1):
-            username = extract_username(url)
-            if not username: continue
-
-            success = False
-            attempts = 0
-            while attempts < 2 and not success:
-                try:
-                    print(f"[{i}/{len(urls_to_scrape)}] @{username}...")
-                    profile = instaloader.Profile.from_username(L.context, username)
-                    
-                    # Einzelne Zeile direkt speichern
-                    row_data = [today_date, profile.full_name, f"@{username}", profile.followers, url.strip()]
-                    sheet.append_row(row_data)
-                    print(f"💾 @{username} gespeichert.")
-                    
-                    success = True
-                    time.sleep(random.uniform(45, 90)) 
-                    
-                except Exception as e:
-                    attempts += 1
-                    print(f"⚠️ Fehler bei {username}: {e}. Versuch {attempts}/2...")
-                    time.sleep(60)
-
-        print("Sortiere Tabelle...")
-        sheet.sort((1, 'des'), (4, 'des'), range='A2:E50000')
+        def make_context():
+            # Ein eigener Kontext pro Worker; Wiederholungen übernimmt der Scheduler
+            L = instaloader.Instaloader(max_connection_attempts=1, quiet=True)
+            if session_id:
+                L.context._session.cookies.set("sessionid", session_id)
+            return L.context
+
+        # Reihenfolge nach Priorität – bei Abbruch fehlen die unwichtigsten Accounts
+        urls_by_username = {a.username: a.url for a in accounts_due}
+
+        print(f"⏱️ Budget: {RATE_PER_MINUTE:g} Abrufe/Minute mit {WORKERS} Workern")
+        scheduler = ProfileScheduler(make_context, rate_per_minute=RATE_PER_MINUTE, workers=WORKERS, report=report,
+                                     deadline_seconds=DEADLINE_MINUTES * 60 or None)
+        writer = BufferedSheetWriter(sheet, batch_size=BATCH_SIZE, flush_seconds=FLUSH_SECONDS,
+                                     rows_on_top=len(sheet_rows_today), width=len(header),
+                                     on_flush=lambda rows: state.mark([r[4] for r in rows], today_date))
+        scraped_rows = []
+        try:
+            with report.phase("scrape"), writer:
+                for i, result in enumerate(scheduler.run(urls_by_username), 1):
+                    username = result.username
+                    if not result.ok:
+                        print(f"[{i}/{len(urls_by_username)}] ❌ @{username} nach {result.attempts} Versuchen übersprungen.")
+                        continue
+
+                    profile = result.profile
+                    print(f"[{i}/{len(urls_by_username)}] @{username}: {result.followers} Follower")
+                    # Grundspalten wie bisher (URL bleibt Spalte E), dahinter alle Kennzahlen aus demselben Abruf
+                    row_data = ([today_date, profile.full_name, f"@{username}", result.followers, urls_by_username[username]]
+                                + result.metrics)
+                    scraped_rows.append(row_data)
+                    writer.add(row_data)
+            if scheduler.aborted:
+                print(f"🛑 Abruf abgebrochen: {scheduler.aborted}. Offene Accounts folgen im nächsten Lauf.")
+        finally:
+            with report.phase("snapshot"):
+                # Lokaler Snapshot-Datenbestand (Quelle fürs Dashboard), auch nach Abbruch
+                append_insta_rows(scraped_rows)
+                print(f"🗄️ {len(scraped_rows)} Zeilen im lokalen Snapshot gespeichert.")
+                if scraped_rows:
+                    # Ranking, Zuwachs und Gesamtsumme nur für den heutigen Tag nachziehen
+                    update_aggregates([today_date])
+                    # Versionsmarke hochzählen: Dashboard zeigt die neuen Daten sofort
+                    bump_version()
+
+        with report.phase("sort"):
+            if shard_count > 1:
+                # Andere Shards schreiben parallel in denselben Block – Größe frisch bestimmen
+                writer.rows_on_top = len(read_today_block(sheet, today_date))
+            # Nur den heutigen Block sortieren – ältere Tage stehen bereits richtig
+            print("Sortiere heutigen Block...")
+            writer.sort_block()
         print("✅ Cloud-Sheet erfolgreich aktualisiert.")
 
-except Exception as e:
-    print(f"❌ KRITISCHER FEHLER: {e}")
-
-print("FERTIG!")
-
+    except Exception as e:
+        report.error = f"{type(e).__name__}: {e}"
+        print(f"❌ KRITISCHER FEHLER: {e}")
+    finally:
+        print(report.format_summary())
+        path = report.write()
+        if path:
+            print(f"📊 Laufbericht: {path}")
+        print("FERTIG!")
 
 
+if __name__ == "__main__":
+    main()
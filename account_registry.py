@@ -0,0 +1,121 @@
+"""Account-Register des Scrapers: welche Profile, wie wichtig, wie oft.
+
+Die Accounts stehen in einer CSV-Datei (Standard: accounts.csv, Env
+ACCOUNTS_FILE) mit den Spalten
+
+    URL              Instagram-Profil-URL (Pflicht)
+    PRIORITY         1 = zuerst abrufen, größere Zahl = später (Standard 1)
+    FREQUENCY_DAYS   alle wie viele Tage abrufen (Standard 1 = täglich)
+    REGION, LIGA     optional, für die Filter im Dashboard-Ranking
+
+Mit `--shard i/N` übernimmt ein Runner nur die Accounts, deren Username per
+CRC32 auf Shard i fällt – stabil über Läufe und Rechner hinweg, ohne
+Abstimmung zwischen den Runnern.
+"""
+import csv
+import os
+import re
+import zlib
+from dataclasses import dataclass
+from datetime import date
+
+import pandas as pd
+
+DEFAULT_ACCOUNTS_FILE = "accounts.csv"
+
+
+@dataclass
+class Account:
+    url: str
+    username: str
+    priority: int = 1
+    frequency_days: int = 1
+    region: str = ""
+    league: str = ""
+
+
+def extract_username(url):
+    match = re.search(r"instagram\.com/([^/?]+)", url)
+    return match.group(1) if match else None
+
+
+def _int_or(value, default):
+    try:
+        return max(1, int(str(value).strip()))
+    except (TypeError, ValueError):
+        return default
+
+
+def load_accounts(path=DEFAULT_ACCOUNTS_FILE):
+    """Accounts aus der CSV-Datei; doppelte oder ungültige URLs werden übersprungen."""
+    accounts = {}
+    with open(path, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            row = {str(k).strip().upper(): v for k, v in row.items() if k}
+            url = str(row.get('URL') or "").strip()
+            username = extract_username(url)
+            if not username:
+                if url:
+                    print(f"⚠️ Ungültige URL im Register übersprungen: {url}")
+                continue
+            if username in accounts:
+                continue
+            accounts[username] = Account(url, username,
+                                         priority=_int_or(row.get('PRIORITY'), 1),
+                                         frequency_days=_int_or(row.get('FREQUENCY_DAYS'), 1),
+                                         region=str(row.get('REGION') or "").strip(),
+                                         league=str(row.get('LIGA') or "").strip())
+    return list(accounts.values())
+
+
+def accounts_frame(accounts):
+    """Register als DataFrame (URL, REGION, LIGA) zum Anreichern der Dashboard-Tabellen."""
+    return pd.DataFrame([(a.url, a.region, a.league) for a in accounts], columns=['URL', 'REGION', 'LIGA'])
+
+
+def parse_shard(spec):
+    """"i/N" -> (i, N) mit 1 <= i <= N."""
+    try:
+        index, count = (int(p) for p in str(spec).split("/"))
+    except ValueError:
+        raise ValueError(f"Shard muss die Form i/N haben, nicht {spec!r}")
+    if not 1 <= index <= count:
+        raise ValueError(f"Shard {spec!r}: i muss zwischen 1 und N liegen")
+    return index, count
+
+
+def shard_of(username, count):
+    """Shard (1..N) eines Accounts – deterministisch, unabhängig von Reihenfolge und Prozess."""
+    return zlib.crc32(username.lower().encode("utf-8")) % count + 1
+
+
+def select_shard(accounts, index, count):
+    return [a for a in accounts if shard_of(a.username, count) == index]
+
+
+def is_due(account, last_scraped, today, interval_days=1):
+    """Fällig, wenn noch nie oder vor mindestens FREQUENCY_DAYS (bzw. `interval_days`) Tagen abgerufen."""
+    if not last_scraped:
+        return True
+    interval_days = max(account.frequency_days, interval_days)
+    return (date.fromisoformat(today) - date.fromisoformat(last_scraped)).days >= interval_days
+
+
+def due_accounts(accounts, last_scraped, today, intervals=None):
+    """Heute fällige Accounts, nach Priorität sortiert (stabile Reihenfolge innerhalb einer Stufe).
+
+    `intervals` (URL -> Tage) kommt aus der adaptiven Planung; FREQUENCY_DAYS
+    aus dem Register bleibt die Untergrenze.
+    """
+    intervals = intervals or {}
+    due = [a for a in accounts if is_due(a, last_scraped.get(a.url), today, intervals.get(a.url, 1))]
+    return sorted(due, key=lambda a: a.priority)
+
+
+def session_id_for(shard_index=None):
+    """Session-Cookie pro Shard (INSTAGRAM_SESSION_ID_<i>), sonst das gemeinsame."""
+    if shard_index is not None:
+        session_id = os.getenv(f"INSTAGRAM_SESSION_ID_{shard_index}")
+        if session_id:
+            return session_id
+    return os.getenv("INSTAGRAM_SESSION_ID")
@@ -0,0 +1,125 @@
+"""Vorberechnete Kennzahlen-Tabellen fürs Dashboard.
+
+Wird direkt nach dem Scraper aufgerufen und aktualisiert nur die Tage,
+die neu dazugekommen sind. Das Dashboard liest danach nur noch drei
+kleine Tabellen statt die komplette Historie durchzurechnen:
+
+    ranking         – letzter Stand pro Verein, nach Followern sortiert
+    trend           – Zuwachs pro Verein je Zeitfenster (Spalte WINDOW)
+    national_total  – Summe aller Follower pro Tag (übersprungene Accounts
+                      zählen mit ihrem letzten Stand, siehe FILL_LIMIT_DAYS)
+
+    python aggregates.py            # komplett neu aufbauen
+"""
+import os
+from datetime import timedelta
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from follower_history import (FILL_LIMIT_DAYS, GROWTH_WINDOWS, FollowerHistory, FollowerMatrix,
+                              window_reference_date)
+from snapshot_store import as_date, insta_dates, read_insta, snapshot_dir
+
+AGGREGATES_DIR = "aggregates"
+AGGREGATE_NAMES = ["ranking", "trend", "national_total"]
+# So weit vor dem Referenzdatum wird nach dem letzten bekannten Stand gesucht
+AS_OF_LOOKBACK = timedelta(days=31)
+
+
+def _aggregate_path(name, base_dir=None):
+    return os.path.join(base_dir or snapshot_dir(), AGGREGATES_DIR, f"{name}.parquet")
+
+
+def read_aggregate(name, base_dir=None):
+    path = _aggregate_path(name, base_dir)
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    return pq.read_table(path, memory_map=True).to_pandas(date_as_object=True)
+
+
+def _write_aggregate(name, df, base_dir=None):
+    path = _aggregate_path(name, base_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path)
+    os.replace(tmp_path, path)
+
+
+def load_aggregates(base_dir=None):
+    """Alle Tabellen als Dict – oder None, solange noch nichts berechnet wurde."""
+    tables = {name: read_aggregate(name, base_dir) for name in AGGREGATE_NAMES}
+    if any(df.empty for df in tables.values()):
+        return None
+    return tables
+
+
+def dedupe_daily(df):
+    """Pro Verein und Tag nur die letzte Zeile behalten (mehrere Läufe am selben Tag)."""
+    return df.sort_values(by=['CLUB_NAME', 'DATE']).drop_duplicates(subset=['CLUB_NAME', 'DATE'], keep='last')
+
+
+def latest_per_club(df):
+    return df.sort_values('DATE').groupby('CLUB_NAME').last().reset_index().sort_values(by='FOLLOWER', ascending=False)
+
+
+def build_trend(df_latest, history, ref_day):
+    """Zuwachs pro Verein: aktueller Stand gegen den Stand zum Referenzdatum (as-of)."""
+    df_then = history.as_of(ref_day).dropna().astype('int64').reset_index()
+    df_trend = pd.merge(df_latest[['CLUB_NAME', 'FOLLOWER']], df_then, on='CLUB_NAME', suffixes=('_neu', '_alt'))
+    df_trend['Zuwachs'] = df_trend['FOLLOWER_neu'] - df_trend['FOLLOWER_alt']
+    return df_trend
+
+
+def build_trends(df_latest, first_date, latest_date, history_for):
+    """Trend-Tabelle für alle Zeitfenster; `history_for(ref_day)` liefert die nötige Historie."""
+    trends = []
+    for window in GROWTH_WINDOWS:
+        ref_day = window_reference_date(window, latest_date, first_date)
+        trend = build_trend(df_latest, history_for(ref_day), ref_day)
+        trend['WINDOW'] = window
+        trend['REF_DATE'] = ref_day
+        trends.append(trend)
+    return pd.concat(trends, ignore_index=True)
+
+
+def update_aggregates(new_dates=None, base_dir=None):
+    """Aktualisiert die Tabellen für `new_dates` (oder baut alles neu, wenn None)."""
+    all_dates = insta_dates(base_dir)
+    if not all_dates:
+        return
+
+    ranking = read_aggregate("ranking", base_dir)
+    totals = read_aggregate("national_total", base_dir)
+
+    if new_dates is None or ranking.empty or totals.empty:
+        # Eine Matrix Verein × Tag für Ranking und Tagessummen (dedupliziert beim Aufbau)
+        matrix = FollowerMatrix(read_insta(base_dir=base_dir))
+        ranking = matrix.ranking()
+        totals = matrix.totals()
+    else:
+        for day in sorted({as_date(d) for d in new_dates}):
+            # Nur die Partition des betroffenen Tages lesen
+            part = dedupe_daily(read_insta(start=day, end=day, base_dir=base_dir))
+            if part.empty:
+                continue
+            ranking = latest_per_club(pd.concat([ranking, part[ranking.columns]], ignore_index=True))
+            # Nicht jeder Account wird täglich abgerufen: letzter Stand der vergangenen Tage zählt mit
+            recent = FollowerHistory(read_insta(start=day - timedelta(days=FILL_LIMIT_DAYS), end=day, base_dir=base_dir))
+            day_total = pd.DataFrame({'DATE': [day], 'FOLLOWER': [int(recent.as_of(day, FILL_LIMIT_DAYS).sum())]})
+            totals = pd.concat([totals[totals['DATE'] != day], day_total], ignore_index=True)
+        totals = totals.sort_values('DATE').reset_index(drop=True)
+
+    # Pro Zeitfenster nur die Partitionen rund um das Referenzdatum lesen
+    trend = build_trends(ranking, all_dates[0], all_dates[-1], lambda ref_day: FollowerHistory(
+        read_insta(start=ref_day - AS_OF_LOOKBACK, end=ref_day, base_dir=base_dir)))
+
+    _write_aggregate("ranking", ranking, base_dir)
+    _write_aggregate("trend", trend, base_dir)
+    _write_aggregate("national_total", totals, base_dir)
+
+
+if __name__ == "__main__":
+    update_aggregates()
+    print("✅ Aggregate neu berechnet.")
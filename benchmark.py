@@ -0,0 +1,419 @@
+"""Offline-Benchmark für Dashboard-Datenaufbereitung und Scraper.
+
+Erzeugt eine synthetische Follower-Historie (N Vereine × D Tage) und
+Zuschauerdaten und stellt sie über lokale Attrappen bereit – ohne Google
+Sheets und ohne Instagram:
+
+    FakeSheet       – das von uns genutzte Stück von gspread `sheet1`
+                      (get_all_records, append_row, sort, insert_rows,
+                      get_values, row_values), optional mit Latenz pro Aufruf
+    FakeClient      – `google_sheets.get_client()` fürs Dashboard, liest aus FakeSheets
+    FakeInstagram   – liefert Profile für `instaloader.Profile.from_username`
+
+Vorab einmal der Kaltstart des Dashboards (frischer Prozess):
+
+    startup             – Importzeit der Dashboard-Module, ob gspread/oauth2client/
+                          plotly dabei geladen werden, und die Bytes des Banners
+                          (erster sichtbarer Inhalt) im Vergleich zum Original-PNG
+
+Gemessen wird je Historienlänge (Standard: 1, 5 und 20 Jahre). Die
+dashboard_*-Fälle führen das echte streamlit_insta_dashboard.py über
+`streamlit.testing.v1.AppTest` aus (inkl. Charts und Tabellen, ohne Browser):
+
+    dashboard_rerun     – ein weiterer Rerun derselben Session (Sheet-Fallback, Caches warm)
+    dashboard_sheet     – erster Aufruf mit leeren Caches, Daten aus dem Sheet (Fallback)
+    dashboard_snapshot  – erster Aufruf mit leeren Caches, lokaler Snapshot + Aggregate
+    aggregates_rebuild  – `python aggregates.py` (kompletter Neuaufbau)
+    zuschauer_model     – AttendanceModel aus dem Zuschauer-Sheet
+    scraper_run         – kompletter Lauf von Insta_account_scraper.main()
+
+    python benchmark.py                            # 60 Vereine, 1/5/20 Jahre
+    python benchmark.py --years 1 5 --clubs 120 --latency-ms 150 --out bench.json
+"""
+import argparse
+import ast
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+from gspread.utils import a1_to_rowcol
+
+from snapshot_store import DATE_PARTITIONING, INSTA_COLUMNS, INSTA_DATASET, INSTA_SCHEMA
+from snapshot_sync import INSTA_SHEET_ID, ZUSCHAUER_SHEET_ID
+
+DASHBOARD_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "streamlit_insta_dashboard.py")
+# Diese Pakete sollen beim Kaltstart aus dem Cache nicht geladen werden müssen
+HEAVY_IMPORTS = ("gspread", "oauth2client", "plotly")
+# Obergrenze für einen Dashboard-Lauf im AppTest (20 Jahre Historie beim Kaltstart)
+DASHBOARD_TIMEOUT_SECONDS = 600
+DEFAULT_CLUBS = 60
+DEFAULT_YEARS = [1, 5, 20]
+ZUSCHAUER_TEAMS = 10
+
+
+# ---------------------------------------------------------------------------
+# Synthetische Daten
+# ---------------------------------------------------------------------------
+
+def synthetic_insta(n_clubs=DEFAULT_CLUBS, days=365, end=None, seed=0):
+    """Follower-Historie als DataFrame in Sheet-Spalten, neuester Tag zuerst.
+
+    Jeder Verein bekommt eine Startgröße (log-normal verteilt) und einen
+    Random Walk mit eigener Volatilität – ein Teil der Vereine ist ruhig.
+    """
+    rng = np.random.default_rng(seed)
+    end = end or date.today() - timedelta(days=1)
+    dates = pd.date_range(end=end, periods=days, freq='D').date
+    start_size = rng.lognormal(mean=7, sigma=1, size=n_clubs).astype(np.int64) + 50
+    drift = rng.normal(0.5, 1.0, size=n_clubs)
+    volatility = np.where(rng.random(n_clubs) < 0.3, 0.2, rng.uniform(1, 8, size=n_clubs))
+    steps = np.rint(drift + rng.normal(0, 1, size=(days, n_clubs)) * volatility).astype(np.int64)
+    followers = np.maximum(start_size + np.cumsum(steps, axis=0), 0)
+
+    usernames = np.array([f"club_{i:04d}" for i in range(n_clubs)])
+    df = pd.DataFrame({
+        'DATE': np.repeat(dates, n_clubs),
+        'CLUB_NAME': np.tile(np.array([f"Verein {i:04d}" for i in range(n_clubs)]), days),
+        'USERNAME': np.tile("@" + usernames, days),
+        'FOLLOWER': followers.ravel(),
+        'URL': np.tile(np.char.add(np.char.add("https://www.instagram.com/", usernames), "/"), days),
+    })
+    return df.sort_values(['DATE', 'FOLLOWER'], ascending=False, ignore_index=True)
+
+
+def synthetic_zuschauer(years=1, teams=ZUSCHAUER_TEAMS, end=None, seed=0):
+    """Heimspiele im Format des Zuschauer-Sheets (Werte als Text wie aus gspread)."""
+    rng = random.Random(seed)
+    end = end or date.today()
+    first_season = (end.year if end.month >= 7 else end.year - 1) - years + 1
+    names = [f"Team {chr(65 + i)}" for i in range(teams)]
+    rows = []
+    for season in range(first_season, first_season + years):
+        for spieltag in range(1, 2 * (teams - 1) + 1):
+            day = date(season, 9, 1) + timedelta(days=7 * (spieltag - 1))
+            if day > end:
+                break
+            home = rng.sample(names, teams // 2)
+            crowd = [rng.randint(40, 400) for _ in home]
+            avg = round(sum(crowd) / len(crowd))
+            for heim, zuschauer in zip(home, crowd):
+                rows.append({'DATUM': day.strftime('%d.%m.%Y'), 'HEIM': heim, 'GAST': "X",
+                             'ZUSCHAUER': zuschauer, 'SPIELTAG': spieltag, 'AVERAGE_SPIELTAG': avg,
+                             'SAISON': f"{season}/{season + 1}"})
+    return pd.DataFrame(rows)
+
+
+def write_insta_snapshot(df, base_dir):
+    """Historie direkt als partitioniertes Dataset ablegen (Aufbau, nicht Teil der Messung)."""
+    table = pa.Table.from_pandas(df[INSTA_COLUMNS], preserve_index=False)
+    # Nur die Grundspalten – wie Dateien von vor den Profil-Kennzahlen
+    table = table.cast(pa.schema([('DATE', pa.date32())] + [INSTA_SCHEMA.field(c) for c in INSTA_COLUMNS[1:]]))
+    ds.write_dataset(table, os.path.join(base_dir, INSTA_DATASET), format="parquet",
+                     partitioning=DATE_PARTITIONING, existing_data_behavior="overwrite_or_ignore")
+
+
+# ---------------------------------------------------------------------------
+# Attrappen für Google Sheets und Instagram
+# ---------------------------------------------------------------------------
+
+class FakeSheet:
+    """Tabellenblatt im Speicher mit der gspread-Schnittstelle, die wir benutzen."""
+
+    def __init__(self, header, rows, latency=0.0):
+        self.header = list(header)
+        self.rows = [list(r) for r in rows]
+        self.latency = latency
+        self.calls = {}
+
+    @classmethod
+    def from_frame(cls, df, latency=0.0):
+        # Google Sheets liefert Datumswerte als Text
+        if 'DATE' in df.columns:
+            df = df.assign(DATE=df['DATE'].astype(str))
+        return cls(df.columns, df.itertuples(index=False, name=None), latency)
+
+    def _call(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    @property
+    def col_count(self):
+        return len(self.header)
+
+    def add_cols(self, cols):
+        self._call("add_cols")
+        self.header += [""] * cols
+
+    def update(self, values, range_name):
+        # Nur für Kopfzeilen-Ergänzungen (extend_header)
+        self._call("update")
+        (r1, c1), _ = (a1_to_rowcol(a) for a in range_name.split(":"))
+        assert r1 == 1, range_name
+        self.header[c1 - 1:c1 - 1 + len(values[0])] = values[0]
+
+    def get_all_records(self):
+        self._call("get_all_records")
+        return [dict(zip(self.header, row)) for row in self.rows]
+
+    def row_values(self, row):
+        self._call("row_values")
+        values = self.header if row == 1 else self.rows[row - 2]
+        return [str(v) for v in values]
+
+    def get_values(self, range_name):
+        self._call("get_values")
+        (r1, c1), (r2, c2) = (a1_to_rowcol(a) for a in range_name.split(":"))
+        # Kopfzeile ist Zeile 1, Daten ab Zeile 2 – ohne das ganze Raster pro Aufruf zu kopieren
+        rows = ([self.header] if r1 == 1 else []) + self.rows[max(r1 - 2, 0):r2 - 1]
+        return [[str(v) for v in row[c1 - 1:c2]] for row in rows]
+
+    def append_row(self, values):
+        self._call("append_row")
+        self.rows.append(list(values))
+
+    def insert_rows(self, values, row=1):
+        self._call("insert_rows")
+        pos = max(row - 2, 0)
+        self.rows[pos:pos] = [list(v) for v in values]
+
+    def sort(self, *specs, range=None):
+        self._call("sort")
+        first, last = 0, len(self.rows)
+        if range:
+            (r1, _), (r2, _) = (a1_to_rowcol(a) for a in range.split(":"))
+            first, last = r1 - 2, r2 - 1
+        block = self.rows[first:last]
+        # Stabil sortieren: letzte Sortierspalte zuerst
+        for col, order in reversed(specs):
+            block.sort(key=lambda r: r[col - 1], reverse=(order == 'des'))
+        self.rows[first:last] = block
+
+
+class FakeClient:
+    """Das Stück von `google_sheets.GoogleClient`, das das Dashboard benutzt – {sheet_id: FakeSheet}."""
+
+    def __init__(self, sheets):
+        self.sheets = sheets
+
+    def read_frame(self, sheet_id, dtypes=None):
+        from sheet_ingest import read_sheet_frame
+        return read_sheet_frame(self.sheets[sheet_id], dtypes)
+
+
+class FakeProfile:
+    def __init__(self, username, full_name, followers):
+        self.username = username
+        self.full_name = full_name
+        self.followers = followers
+        # Payload wie von der Profilseite – daraus liest profile_metrics
+        self._node = {"full_name": full_name, "follower_count": followers, "following_count": 150,
+                      "media_count": 320, "highlight_reel_count": 4, "is_verified": False,
+                      "is_business": True, "is_private": False, "category": "Sportmannschaft"}
+
+
+class FakeInstagram:
+    """Profilquelle für `instaloader.Profile.from_username` auf Basis der letzten Historie."""
+
+    def __init__(self, latest, latency=0.0, seed=0):
+        self.latest = {u.lstrip("@"): (name, int(f)) for u, name, f in
+                       latest[['USERNAME', 'CLUB_NAME', 'FOLLOWER']].itertuples(index=False, name=None)}
+        self.latency = latency
+        self.calls = 0
+        self._rng = random.Random(seed)
+
+    def from_username(self, context, username):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        name, followers = self.latest[username]
+        return FakeProfile(username, name, followers + self._rng.randint(-2, 10))
+
+
+# ---------------------------------------------------------------------------
+# Gemessene Pfade
+# ---------------------------------------------------------------------------
+
+class DashboardApp:
+    """Eine Session des echten Dashboards im AppTest; ohne Snapshot liest es über FakeClient."""
+
+    def __init__(self, sheets):
+        from streamlit.logger import set_log_level
+        from streamlit.testing.v1 import AppTest
+
+        # Hinweise von Streamlit ohne Server ("missing ScriptRunContext") nicht in die Ausgabe
+        set_log_level("error")
+        self.at = AppTest.from_file(DASHBOARD_SCRIPT, default_timeout=DASHBOARD_TIMEOUT_SECONDS)
+        # Nur damit `st.secrets[...]` existiert – get_client liefert den FakeClient
+        self.at.secrets["gcp_service_account"] = {"client_email": "benchmark@example.invalid"}
+        self.client = FakeClient(sheets)
+
+    def run(self, snapshot_dir):
+        with mock.patch.dict(os.environ, {"SNAPSHOT_DIR": snapshot_dir}), \
+                mock.patch("google_sheets.get_client", lambda creds_dict=None: self.client):
+            self.at.run()
+        errors = [e.value for e in self.at.exception] + [e.value for e in self.at.error]
+        if errors:
+            raise RuntimeError(f"Dashboard-Lauf fehlgeschlagen: {errors[0]}")
+
+
+def bench_dashboard_cold(sheets, snapshot_dir):
+    """Erster Besucher nach einem Deploy: prozessweite Caches leer, Daten aus Snapshot oder Sheet."""
+    import streamlit as st
+
+    app = DashboardApp(sheets)
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    app.run(snapshot_dir)
+
+
+def bench_aggregates_rebuild(base_dir):
+    from aggregates import update_aggregates
+    update_aggregates(base_dir=base_dir)
+
+
+def bench_zuschauer(sheet):
+    from zuschauer_model import AttendanceModel
+    from sheet_ingest import ZUSCHAUER_SHEET_DTYPES, read_sheet_frame
+    AttendanceModel(read_sheet_frame(sheet, ZUSCHAUER_SHEET_DTYPES))
+
+
+def bench_scraper_run(df, base_dir, latency):
+    """Kompletter Scraper-Lauf gegen FakeSheet/FakeInstagram; Sheet und Snapshot enthalten die Historie."""
+    import instaloader
+    import Insta_account_scraper as scraper
+
+    sheet = FakeSheet.from_frame(df, latency)
+    instagram = FakeInstagram(df[df['DATE'] == df['DATE'].max()], latency)
+    accounts_file = os.path.join(base_dir, "accounts.csv")
+    pd.DataFrame({'URL': df['URL'].unique(), 'PRIORITY': 1, 'FREQUENCY_DAYS': 1}).to_csv(accounts_file, index=False)
+
+    with mock.patch.object(scraper, "get_google_sheet", lambda sheet_id: sheet), \
+            mock.patch.object(instaloader.Profile, "from_username", instagram.from_username), \
+            mock.patch.multiple(scraper, RATE_PER_MINUTE=1e9, FLUSH_SECONDS=1e9,
+                                STATE_FILE=os.path.join(base_dir, "scrape_state.json"),
+                                REPORT_DIR=os.path.join(base_dir, "run_reports")), \
+            _quiet():
+        scraper.main(["--accounts", accounts_file])
+    return {"profiles": instagram.calls, **{f"sheet.{k}": v for k, v in sheet.calls.items()}}
+
+
+def dashboard_imports(path=DASHBOARD_SCRIPT):
+    """Module, die das Dashboard auf oberster Ebene importiert (in Reihenfolge)."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            modules.append(node.module)
+    return modules
+
+
+def bench_startup():
+    """Dashboard-Importe in einem frischen Prozess – so wie beim ersten Besucher nach einem Deploy."""
+    from static_assets import BANNER_SOURCE, banner_image
+    code = (
+        "import importlib, json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"for name in {dashboard_imports()!r}: importlib.import_module(name)\n"
+        "elapsed = (time.perf_counter() - start) * 1000\n"
+        f"heavy = sorted(m for m in {HEAVY_IMPORTS!r} if m in sys.modules)\n"
+        "print(json.dumps({'import_ms': round(elapsed, 1), 'heavy_loaded': heavy}))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(DASHBOARD_SCRIPT),
+                         capture_output=True, text=True, check=True)
+    info = json.loads(out.stdout.strip().splitlines()[-1])
+    banner = banner_image(static_serving=False)
+    info.update(banner_bytes=os.path.getsize(banner), banner_source_bytes=os.path.getsize(BANNER_SOURCE))
+    return info
+
+
+@contextmanager
+def _quiet():
+    with open(os.devnull, "w") as devnull, mock.patch("sys.stdout", devnull):
+        yield
+
+
+def _timed(fn, repeat):
+    times, info = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        info = fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(times), 1), round(min(times), 1), info
+
+
+def run(years_list=DEFAULT_YEARS, n_clubs=DEFAULT_CLUBS, repeat=3, latency=0.0):
+    results = []
+    # Frischer Prozess pro Messung; gemeldet wird die reine Importzeit ohne Interpreterstart
+    startups = [bench_startup() for _ in range(repeat)]
+    startup = dict(startups[-1], import_ms=round(statistics.median(s['import_ms'] for s in startups), 1))
+    results.append({"years": None, "rows": 0, "case": "startup",
+                    "median_ms": startup['import_ms'], "min_ms": min(s['import_ms'] for s in startups),
+                    "info": startup})
+    print(f"{'-':>3}   | {'startup':<20} {startup['import_ms']:>10.1f} ms  {startup}")
+    for years in years_list:
+        df = synthetic_insta(n_clubs, days=365 * years)
+        df_z = synthetic_zuschauer(years)
+        with tempfile.TemporaryDirectory() as base_dir, tempfile.TemporaryDirectory() as no_snapshot, \
+                mock.patch.dict(os.environ, {"SNAPSHOT_DIR": base_dir}):
+            write_insta_snapshot(df, base_dir)
+            bench_aggregates_rebuild(base_dir)
+            insta_sheet = FakeSheet.from_frame(df, latency)
+            zuschauer_sheet = FakeSheet.from_frame(df_z, latency)
+            sheets = {INSTA_SHEET_ID: insta_sheet, ZUSCHAUER_SHEET_ID: zuschauer_sheet}
+            # Session für die Rerun-Messung: einmal kalt laden, danach nur noch Reruns.
+            # Vor den Kaltstart-Fällen messen – die leeren die prozessweiten Caches.
+            rerun_app = DashboardApp(sheets)
+            rerun_app.run(no_snapshot)
+            cases = [
+                ("dashboard_rerun", lambda: rerun_app.run(no_snapshot)),
+                ("dashboard_sheet", lambda: bench_dashboard_cold(sheets, no_snapshot)),
+                ("dashboard_snapshot", lambda: bench_dashboard_cold(sheets, base_dir)),
+                ("aggregates_rebuild", lambda: bench_aggregates_rebuild(base_dir)),
+                ("zuschauer_model", lambda: bench_zuschauer(zuschauer_sheet)),
+                # Der Scraper schreibt in Sheet und Snapshot – ein Lauf pro Historienlänge
+                ("scraper_run", lambda: bench_scraper_run(df, base_dir, latency)),
+            ]
+            for name, fn in cases:
+                median_ms, min_ms, info = _timed(fn, 1 if name == "scraper_run" else repeat)
+                results.append({"years": years, "rows": len(df), "case": name,
+                                "median_ms": median_ms, "min_ms": min_ms, "info": info})
+                print(f"{years:>3} J | {name:<20} {median_ms:>10.1f} ms" + (f"  {info}" if info else ""))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline-Benchmark mit synthetischen Daten.")
+    parser.add_argument("--years", type=int, nargs="+", default=DEFAULT_YEARS)
+    parser.add_argument("--clubs", type=int, default=DEFAULT_CLUBS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="Simulierte Latenz pro Sheets-/Instagram-Aufruf")
+    parser.add_argument("--out", help="Ergebnisse zusätzlich als JSON speichern")
+    args = parser.parse_args(argv)
+
+    results = run(args.years, args.clubs, args.repeat, args.latency_ms / 1000)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"created_at": datetime.now().isoformat(timespec="seconds"),
+                       "clubs": args.clubs, "latency_ms": args.latency_ms, "results": results}, f, indent=1)
+        print(f"💾 Ergebnisse in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import threading
+import time
+
+
+class SharedDataCache:
+    """Prozessweiter Daten-Cache für alle Streamlit-Sessions.
+
+    - Single-Flight: pro Schlüssel lädt immer nur ein Thread, alle anderen warten
+      auf genau dieses Ergebnis statt selbst Google Sheets anzufragen.
+    - Stale-while-revalidate: ist ein Eintrag veraltet, bekommt der Nutzer sofort
+      die alten Daten und das Nachladen läuft im Hintergrund.
+    - Invalidierung über eine Versionsmarke (`version_fn`), die der Scraper nach
+      jedem Lauf hochzählt. Ohne Marke (None) gilt stattdessen `max_age`.
+    """
+
+    def __init__(self, version_fn, max_age=3600, check_seconds=30, log=print):
+        self.version_fn = version_fn
+        self.max_age = max_age
+        self.check_seconds = check_seconds
+        self.log = log
+        self._entries = {}   # key -> (value, version, geladen_um)
+        self._loading = {}   # key -> threading.Event des laufenden Ladevorgangs
+        self._errors = {}
+        self._checked = (0.0, None)
+        self._lock = threading.Lock()
+
+    def _current_version(self):
+        # Die Marke ist eine kleine lokale Datei – trotzdem nicht bei jedem Rerun lesen
+        checked_at, version = self._checked
+        now = time.monotonic()
+        if now - checked_at >= self.check_seconds:
+            try:
+                version = self.version_fn()
+            except Exception as e:
+                self.log(f"⚠️ Versionsmarke nicht lesbar: {e}")
+            self._checked = (now, version)
+        return version
+
+    def _is_stale(self, entry, version):
+        _, loaded_version, loaded_at = entry
+        if version is not None:
+            return version != loaded_version
+        return time.monotonic() - loaded_at >= self.max_age
+
+    def _load(self, key, loader, version, done):
+        try:
+            value = loader()
+            with self._lock:
+                self._entries[key] = (value, version, time.monotonic())
+                self._errors.pop(key, None)
+        except Exception as e:
+            self.log(f"⚠️ Laden von {key} fehlgeschlagen: {e}")
+            with self._lock:
+                self._errors[key] = e
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            done.set()
+
+    def get(self, key, loader):
+        """Wert für `key`; `loader()` wird nur aufgerufen, wenn wirklich nachgeladen werden muss."""
+        return self.get_stamped(key, loader)[0]
+
+    def get_stamped(self, key, loader):
+        """Wie `get`, dazu ein Stempel, der sich mit jedem Nachladen ändert.
+
+        Abgeleitete Caches (z. B. fertige Charts) hängen den Stempel an ihren
+        Schlüssel – Wert und Stempel stammen garantiert aus demselben Ladevorgang.
+        """
+        version = self._current_version()
+        with self._lock:
+            entry = self._entries.get(key)
+            running = self._loading.get(key)
+            start = running is None and (entry is None or self._is_stale(entry, version))
+            if start:
+                running = self._loading[key] = threading.Event()
+
+        if entry is not None:
+            if start:
+                threading.Thread(target=self._load, args=(key, loader, version, running), daemon=True).start()
+            return entry[0], (entry[1], entry[2])
+
+        # Noch gar nichts im Cache: einmalig warten (der erste Lader arbeitet, der Rest wartet mit)
+        if start:
+            self._load(key, loader, version, running)
+        else:
+            running.wait()
+        with self._lock:
+            if key in self._entries:
+                value, loaded_version, loaded_at = self._entries[key]
+                return value, (loaded_version, loaded_at)
+            raise self._errors.get(key) or RuntimeError(f"Keine Daten für {key}")
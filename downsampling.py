@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+# Obergrenze an Punkten pro Linie, die an den Browser geschickt werden
+MAX_POINTS_PER_SERIES = 400
+# Ab dieser Spannweite wird wöchentlich bzw. monatlich aggregiert
+WEEKLY_FROM_DAYS = 180
+MONTHLY_FROM_DAYS = 3 * 365
+
+
+def choose_frequency(start, end):
+    """Tägliche, wöchentliche oder monatliche Auflösung je nach sichtbarem Zeitraum."""
+    span_days = (pd.Timestamp(end) - pd.Timestamp(start)).days
+    if span_days >= MONTHLY_FROM_DAYS:
+        return 'M'
+    if span_days >= WEEKLY_FROM_DAYS:
+        return 'W'
+    return 'D'
+
+
+def lttb_indices(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: Indizes der Punkte, die die Form der Kurve erhalten."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    bucket_size = (n - 2) / (threshold - 2)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start = int(np.floor(i * bucket_size)) + 1
+        end = int(np.floor((i + 1) * bucket_size)) + 1
+        next_end = min(int(np.floor((i + 2) * bucket_size)) + 1, n)
+        # Mittelwert des nächsten Buckets als dritter Dreieckspunkt
+        avg_x = x[end:next_end].mean() if next_end > end else x[-1]
+        avg_y = y[end:next_end].mean() if next_end > end else y[-1]
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+    return indices
+
+
+def _downsample_one(df, x, y, freq, max_points):
+    series = df.set_index(pd.to_datetime(df[x]))[y].sort_index()
+    if freq != 'D':
+        # Follower sind Bestandswerte: pro Woche/Monat zählt der letzte Stand (mit echtem Datum)
+        series = series.groupby(series.index.to_period(freq)).tail(1)
+    keep = lttb_indices(series.index.asi8, series.to_numpy(), max_points)
+    series = series.iloc[keep]
+    return pd.DataFrame({x: series.index.date, y: series.to_numpy()})
+
+
+def prepare_timeseries(df, x='DATE', y='FOLLOWER', group=None, max_points=MAX_POINTS_PER_SERIES):
+    """Zeitreihe(n) für Plotly: passend aggregieren und per LTTB auf `max_points` begrenzen."""
+    if df.empty:
+        return df
+    freq = choose_frequency(df[x].min(), df[x].max())
+    if group is None:
+        return _downsample_one(df, x, y, freq, max_points)
+    parts = []
+    for name, part in df.groupby(group, sort=False):
+        part = _downsample_one(part, x, y, freq, max_points)
+        part.insert(0, group, name)
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True)
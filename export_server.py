@@ -0,0 +1,201 @@
+"""Schlanker Read-only-Export der Kennzahlen als JSON/CSV für Partnerseiten.
+
+Liest dieselben lokalen Daten wie das Dashboard (Aggregate aus aggregates.py,
+Zuschauer-Snapshot aus snapshot_sync.py) und liefert sie ohne Streamlit aus:
+
+    /ranking.json            aktueller Stand pro Verein, nach Followern sortiert
+    /growth.json?window=...  Zuwachs pro Verein ("7 Tage", "4 Wochen", "Saisonstart")
+    /national_total.json     Summe aller Follower pro Tag
+    /attendance.json         Zuschauerschnitt pro Saison
+
+Jede Tabelle gibt es auch als .csv. Antworten tragen einen ETag (Hash des
+Inhalts); bei passendem If-None-Match gibt es nur ein 304. Gerendert wird
+einmal pro Datenstand (Versionsmarke des Scrapers), danach kostet ein Abruf
+nur noch einen Dict-Zugriff.
+
+    python export_server.py --port 8502
+"""
+import argparse
+import hashlib
+import json
+import os
+from datetime import date
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from aggregates import load_aggregates
+from data_cache import SharedDataCache
+from follower_history import DEFAULT_WINDOW, GROWTH_WINDOWS
+from snapshot_store import has_dataset, read_table_snapshot, read_version
+
+ZUSCHAUER_DATASET = "zuschauer"
+DEFAULT_PORT = int(os.getenv("EXPORT_PORT", 8502))
+# Browser und CDNs dürfen kurz zwischenspeichern, danach reicht ein 304
+CACHE_MAX_AGE_SECONDS = 300
+
+cache = SharedDataCache(read_version)
+
+
+class NotAvailable(Exception):
+    pass
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _aggregates():
+    # Direkt laden, nicht über `cache`: ein verschachtelter Eintrag liefert nach einer neuen
+    # Version noch den alten Stand, und render() würde ihn unter der neuen Version ablegen
+    tables = load_aggregates()
+    if tables is None:
+        raise NotAvailable("Noch keine Aggregate vorhanden (python aggregates.py).")
+    return tables
+
+
+def ranking_table():
+    df = _aggregates()['ranking'][['CLUB_NAME', 'USERNAME', 'FOLLOWER', 'URL', 'DATE']]
+    return df.assign(RANG=range(1, len(df) + 1))[['RANG', 'CLUB_NAME', 'USERNAME', 'FOLLOWER', 'URL', 'DATE']]
+
+
+def growth_window(params):
+    window = params.get("window", DEFAULT_WINDOW)
+    if window not in GROWTH_WINDOWS:
+        raise BadRequest(f"Unbekanntes Zeitfenster {window!r}, erlaubt: {', '.join(GROWTH_WINDOWS)}")
+    return window
+
+
+def growth_table(window=DEFAULT_WINDOW):
+    window = growth_window({"window": window})
+    trend = _aggregates()['trend']
+    trend = trend[trend['WINDOW'] == window].sort_values('Zuwachs', ascending=False)
+    return trend.rename(columns={'FOLLOWER_neu': 'FOLLOWER', 'FOLLOWER_alt': 'FOLLOWER_REF', 'Zuwachs': 'ZUWACHS'})[
+        ['CLUB_NAME', 'FOLLOWER', 'FOLLOWER_REF', 'ZUWACHS', 'REF_DATE', 'WINDOW']]
+
+
+def national_total_table():
+    return _aggregates()['national_total'][['DATE', 'FOLLOWER']]
+
+
+def attendance_table():
+    from zuschauer_model import AttendanceModel
+    if not has_dataset(ZUSCHAUER_DATASET):
+        raise NotAvailable("Kein Zuschauer-Snapshot vorhanden (python snapshot_sync.py pull).")
+    model = AttendanceModel(read_table_snapshot(ZUSCHAUER_DATASET))
+    table = model.season_table[['SAISON', 'ZUSCHAUER']]
+    return table.assign(ZUSCHAUER=table['ZUSCHAUER'].round(0).astype('int64'))
+
+
+# Name -> (Variante aus den Query-Parametern, Tabelle zu dieser Variante)
+TABLES = {
+    "ranking": (lambda params: None, lambda variant: ranking_table()),
+    "growth": (growth_window, growth_table),
+    "national_total": (lambda params: None, lambda variant: national_total_table()),
+    "attendance": (lambda params: None, lambda variant: attendance_table()),
+}
+
+
+def _json_default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} nicht serialisierbar")
+
+
+def serialize(df, fmt):
+    if fmt == "csv":
+        return df.to_csv(index=False).encode("utf-8"), "text/csv; charset=utf-8"
+    records = [dict(zip(df.columns, row)) for row in df.astype(object).itertuples(index=False, name=None)]
+    body = json.dumps(records, ensure_ascii=False, default=_json_default, separators=(",", ":"))
+    return body.encode("utf-8"), "application/json; charset=utf-8"
+
+
+def render(name, fmt, params):
+    """(Body, Content-Type, ETag) – einmal pro Datenstand und Variante berechnet.
+
+    Schlüssel ist nur die Variante (Zeitfenster bei growth), nicht alle Parameter:
+    Cache-Buster wie `?_=<ts>` legen so keine neuen Einträge an.
+    """
+    variant_of, table = TABLES[name]
+    variant = variant_of(params)
+
+    def build():
+        body, content_type = serialize(table(variant), fmt)
+        return body, content_type, '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    return cache.get(("export", name, fmt, variant), build)
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidates = [c.strip().removeprefix("W/") for c in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class ExportHandler(BaseHTTPRequestHandler):
+    server_version = "FutsalExport/1.0"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        name, _, fmt = url.path.strip("/").partition(".")
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if name not in TABLES or fmt not in ("json", "csv"):
+            return self._send_error(HTTPStatus.NOT_FOUND,
+                                    f"Unbekannter Pfad. Verfügbar: {', '.join(f'/{t}.json|csv' for t in TABLES)}")
+        try:
+            body, content_type, etag = render(name, fmt, params)
+        except BadRequest as e:
+            return self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+        except NotAvailable as e:
+            return self._send_error(HTTPStatus.SERVICE_UNAVAILABLE, str(e))
+        except Exception as e:
+            print(f"❌ Export {self.path} fehlgeschlagen: {type(e).__name__}: {e}")
+            return self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, "Interner Fehler beim Erzeugen des Exports.")
+
+        if etag_matches(self.headers.get("If-None-Match"), etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self._send_cache_headers(etag)
+            self.end_headers()
+            return
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self._send_cache_headers(etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_cache_headers(self, etag):
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", f"public, max-age={CACHE_MAX_AGE_SECONDS}")
+        self.send_header("Access-Control-Allow-Origin", "*")
+
+    def _send_error(self, status, message):
+        body = json.dumps({"error": message}, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Tausende Embed-Abrufe am Tag: kein Log pro Anfrage
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSON/CSV-Export der Dashboard-Kennzahlen.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+    server = ThreadingHTTPServer((args.host, args.port), ExportHandler)
+    print(f"🌐 Export läuft auf http://{args.host}:{args.port}/ranking.json")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
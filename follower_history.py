@@ -0,0 +1,204 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from profile_metrics import CHART_METRICS, metric_values
+
+# Auswahl im Dashboard: Anzeigename -> Referenzdatum relativ zum letzten Stand
+GROWTH_WINDOWS = {
+    "7 Tage": lambda latest: latest - timedelta(days=7),
+    "4 Wochen": lambda latest: latest - timedelta(weeks=4),
+    "Saisonstart": lambda latest: season_start(latest),
+}
+DEFAULT_WINDOW = "4 Wochen"
+# Der Scraper ruft ruhige Accounts nur alle paar Tage ab – so lange gilt der letzte Stand weiter.
+# Danach zählt ein Verein nicht mehr mit (z. B. aus dem Register entfernt).
+FILL_LIMIT_DAYS = 14
+
+
+def season_start(d):
+    """Saison beginnt am 1. Juli (wie in der Zuschauer-Auswertung)."""
+    return date(d.year if d.month >= 7 else d.year - 1, 7, 1)
+
+
+def window_reference_date(window, latest_date, first_date=None):
+    """Referenzdatum eines Zeitfensters – nie vor dem ersten vorhandenen Tag."""
+    ref_day = GROWTH_WINDOWS[window](latest_date)
+    return max(ref_day, first_date) if first_date else ref_day
+
+
+class FollowerMatrix:
+    """Follower-Historie als dichte int32-Matrix Verein × Tag.
+
+    Zeilen sind die Vereine (alphabetisch), Spalten alle Tage, an denen
+    gescraped wurde. Jede Zelle hält den letzten bekannten Stand an oder vor
+    diesem Tag (MISSING, solange es den Verein noch nicht gab); `observed`
+    merkt sich, wo wirklich gescraped wurde. Einmal pro Datenstand gebaut,
+    sind danach Stand, Zuwachs über ein Fenster und Tagessumme reine
+    Spalten-Operationen und die Zeilen ausgewählter Vereine ein Dict-Zugriff.
+
+    Zähler aus profile_metrics (Gefolgt, Beiträge, …) liegen daneben nur für
+    die beobachteten Zellen vor und werden nicht aufgefüllt.
+    """
+
+    MISSING = -1
+
+    def __init__(self, df, max_gap_days=FILL_LIMIT_DAYS):
+        self.max_gap_days = max_gap_days
+        codes, clubs = pd.factorize(df['CLUB_NAME'], sort=True)
+        self.clubs = pd.Index(np.asarray(clubs, dtype=object), name='CLUB_NAME')
+        self._positions = {club: i for i, club in enumerate(self.clubs)}
+        day_numbers = pd.to_datetime(df['DATE']).to_numpy().astype('datetime64[D]').astype(np.int64)
+        self.days, cols = np.unique(day_numbers, return_inverse=True)
+        n_clubs, n_days = len(self.clubs), len(self.days)
+
+        # Mehrere Zeilen pro Verein und Tag: die letzte gewinnt (wie drop_duplicates(keep='last'))
+        cells = codes.astype(np.int64) * n_days + cols
+        cells, first_from_end = np.unique(cells[::-1], return_index=True)
+        rows = len(df) - 1 - first_from_end
+        self.rows = len(cells)
+
+        observed = np.zeros(n_clubs * n_days, dtype=bool)
+        observed[cells] = True
+        self.observed = observed.reshape(n_clubs, n_days)
+        raw = np.zeros(n_clubs * n_days, dtype=np.int32)
+        raw[cells] = df['FOLLOWER'].to_numpy()[rows]
+        last_col = self._last_observed(self.observed)
+        self.values = np.where(last_col >= 0,
+                               np.take_along_axis(raw.reshape(n_clubs, n_days), np.clip(last_col, 0, None), axis=1),
+                               self.MISSING).astype(np.int32)
+
+        # Letzte Zeile pro Verein (URL, USERNAME, DATE des letzten Abrufs) fürs Ranking
+        club_of = cells // n_days if n_days else cells
+        is_last = np.append(club_of[1:] != club_of[:-1], True) if len(cells) else np.zeros(0, dtype=bool)
+        self._latest = df.iloc[rows[is_last]].reset_index(drop=True)
+        self._totals = self._filled(self.values, last_col).sum(axis=0, dtype=np.int64)
+
+        # Profil-Kennzahlen pro beobachteter Zelle (NaN = an dem Tag nicht erhoben, z. B. ältere Zeilen)
+        self._cells = cells
+        self._metrics = {m.column: metric_values(df[m.column])[rows] for m in CHART_METRICS if m.column in df.columns}
+
+    @staticmethod
+    def _last_observed(observed):
+        """Spalte des letzten Abrufs an oder vor jeder Zelle (-1 = noch nie)."""
+        cols = np.where(observed, np.arange(observed.shape[1], dtype=np.int32), np.int32(-1))
+        return np.maximum.accumulate(cols, axis=1) if cols.size else cols
+
+    def _filled(self, values, last_col):
+        # Stände, die älter als max_gap_days sind, zählen nicht mehr (0 statt MISSING für Summen)
+        age = self.days[None, :] - self.days[np.clip(last_col, 0, None)]
+        return np.where((last_col >= 0) & (age <= self.max_gap_days), values, 0)
+
+    @property
+    def empty(self):
+        return self.rows == 0
+
+    @property
+    def dates(self):
+        """Alle Tage der Datumsachse, aufsteigend."""
+        return self.days.astype('datetime64[D]').astype(object)
+
+    @property
+    def first_date(self):
+        return self.dates[0]
+
+    @property
+    def latest_date(self):
+        return self.dates[-1]
+
+    def positions(self, clubs):
+        """Zeilen der Matrix für `clubs` (unbekannte Vereine fallen weg)."""
+        return np.array([self._positions[c] for c in clubs if c in self._positions], dtype=np.int64)
+
+    def column(self, day):
+        """Spalte für den Stand am Tag `day` (-1, wenn vor dem ersten Tag)."""
+        return int(np.searchsorted(self.days, np.datetime64(day, 'D').astype(np.int64), side='right')) - 1
+
+    def as_of(self, day):
+        """Follower pro Verein zum Stand `day` (NaN, falls der Verein erst später dazukam)."""
+        col = self.column(day)
+        values = self.values[:, col] if col >= 0 else np.full(len(self.clubs), self.MISSING)
+        return pd.Series(np.where(values == self.MISSING, np.nan, values), index=self.clubs, name='FOLLOWER')
+
+    def ranking(self):
+        """Letzte Zeile pro Verein, nach Followern sortiert (wie aggregates.latest_per_club)."""
+        return self._latest.sort_values(by='FOLLOWER', ascending=False)
+
+    def growth(self, ref_day, end_day=None):
+        """Zuwachs pro Verein zwischen `ref_day` und `end_day` (Standard: letzter Stand), größte Vereine zuerst."""
+        end_col = self.column(end_day) if end_day else len(self.days) - 1
+        ref_col = self.column(ref_day)
+        new = self.values[:, end_col]
+        old = self.values[:, ref_col] if ref_col >= 0 else np.full(len(self.clubs), self.MISSING)
+        keep = (new != self.MISSING) & (old != self.MISSING)
+        df = pd.DataFrame({'CLUB_NAME': self.clubs[keep], 'FOLLOWER_neu': new[keep].astype('int64'),
+                           'FOLLOWER_alt': old[keep].astype('int64')})
+        df['Zuwachs'] = df['FOLLOWER_neu'] - df['FOLLOWER_alt']
+        return df.sort_values(by='FOLLOWER_neu', ascending=False, kind='stable', ignore_index=True)
+
+    def series(self, clubs=None):
+        """Aufgefüllte Zeitreihen (CLUB_NAME, DATE, FOLLOWER) – alle oder nur die Zeilen von `clubs`."""
+        rows = np.arange(len(self.clubs)) if clubs is None else np.sort(self.positions(clubs))
+        values = self.values[rows]
+        last_col = self._last_observed(self.observed[rows])
+        age = self.days[None, :] - self.days[np.clip(last_col, 0, None)]
+        r, c = np.nonzero((last_col >= 0) & (age <= self.max_gap_days))
+        return pd.DataFrame({'CLUB_NAME': self.clubs[rows][r], 'DATE': self.dates[c],
+                             'FOLLOWER': values[r, c].astype('int64')})
+
+    @property
+    def metrics(self):
+        """Zähler-Kennzahlen, für die es mindestens einen Wert gibt."""
+        return [column for column, values in self._metrics.items() if not np.isnan(values).all()]
+
+    def metric_series(self, column, clubs=None):
+        """Erhobene Werte einer Kennzahl (CLUB_NAME, DATE, <column>) – alle oder nur `clubs`."""
+        values = self._metrics[column]
+        club_of, day_of = np.divmod(self._cells, max(len(self.days), 1))
+        keep = ~np.isnan(values)
+        if clubs is not None:
+            keep &= np.isin(club_of, self.positions(clubs))
+        return pd.DataFrame({'CLUB_NAME': self.clubs[club_of[keep]], 'DATE': self.dates[day_of[keep]],
+                             column: values[keep].astype('int64')})
+
+    def totals(self):
+        """Summe aller Follower pro Tag (Spaltensummen, Lücken bis max_gap_days aufgefüllt)."""
+        return pd.DataFrame({'DATE': self.dates, 'FOLLOWER': self._totals})
+
+
+class FollowerHistory:
+    """Sortierter Zeitindex der Follower-Historie mit As-of-Abfragen.
+
+    Alle Zeilen liegen nach (Verein, Datum) sortiert in NumPy-Arrays. Eine
+    Abfrage "Stand am Tag X" ist damit eine binäre Suche über alle Vereine
+    gleichzeitig und liefert pro Verein den letzten Wert an oder vor X –
+    auch wenn der Verein genau an diesem Tag nicht gescraped wurde.
+    """
+
+    def __init__(self, df):
+        df = df.sort_values(by=['CLUB_NAME', 'DATE']).drop_duplicates(subset=['CLUB_NAME', 'DATE'], keep='last')
+        codes, clubs = pd.factorize(df['CLUB_NAME'], sort=True)
+        self.clubs = pd.Index(clubs, name='CLUB_NAME')
+        self.days = pd.to_datetime(df['DATE']).to_numpy().astype('datetime64[D]').astype(np.int64)
+        self.values = df['FOLLOWER'].to_numpy()
+        self.codes = codes.astype(np.int64)
+        # Zusammengesetzter Schlüssel (Verein, Tag) – monoton steigend, daher searchsorted-fähig
+        self._span = int(self.days.max() - self.days.min()) + 2 if len(self.days) else 1
+        self._offset = int(self.days.min()) if len(self.days) else 0
+        self._keys = self.codes * self._span + (self.days - self._offset)
+
+    def as_of(self, day, max_age_days=None):
+        """Follower pro Verein zum Stand `day` (NaN, falls der Verein erst später dazukam).
+
+        Mit `max_age_days` zählen nur Stände, die höchstens so alt sind.
+        """
+        day = np.datetime64(day, 'D').astype(np.int64) - self._offset
+        day = min(max(day, -1), self._span - 2)
+        codes = np.arange(len(self.clubs), dtype=np.int64)
+        pos = np.searchsorted(self._keys, codes * self._span + day, side='right') - 1
+        found = (pos >= 0) & (self.codes[np.clip(pos, 0, None)] == codes)
+        if max_age_days is not None:
+            found &= (day + self._offset - self.days[np.clip(pos, 0, None)]) <= max_age_days
+        result = np.where(found, self.values[np.clip(pos, 0, None)], np.nan)
+        return pd.Series(result, index=self.clubs, name='FOLLOWER')
@@ -0,0 +1,136 @@
+"""Gemeinsamer Google-Sheets-Zugang für Scraper, Sync und Dashboard.
+
+Ein `GoogleClient` hält genau eine autorisierte Session (requests mit
+Keep-Alive) pro Service-Account. Das Token wird kurz vor Ablauf erneuert
+statt erst nach einem 401. Worksheet-Handles werden pro Sheet-ID gecacht:
+`open_by_key` (Metadaten-Abruf) läuft nur einmal pro Prozess. Gelesen wird
+als typisiertes DataFrame über sheet_ingest (blockweise Rohwerte statt
+`get_all_records`).
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import gspread
+from oauth2client.service_account import ServiceAccountCredentials
+from requests.adapters import HTTPAdapter
+
+from sheet_ingest import read_sheet_frame
+
+SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+LOCAL_CREDS_PATH = r"C:\Users\Daniel\Dropbox\Mister Futsal\User-Auswertung\futsal-instagram-stats-credentioals.json"
+# Token so lange vor Ablauf erneuern (Google-Tokens gelten eine Stunde)
+REFRESH_MARGIN = timedelta(minutes=5)
+MAX_PARALLEL_FETCHES = 4
+# Vorab geladene Sheets verfallen, wenn sie nicht bald abgeholt werden
+PREFETCH_MAX_AGE_SECONDS = 120
+
+
+def _utcnow():
+    # google-auth rechnet mit naiven UTC-Zeitstempeln
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class GoogleClient:
+    """Autorisierte Sheets-Session mit Token-Refresh, Worksheet-Cache und Parallel-Abruf."""
+
+    def __init__(self, credentials, refresh_margin=REFRESH_MARGIN, max_workers=MAX_PARALLEL_FETCHES):
+        self.client = gspread.authorize(credentials)
+        self.refresh_margin = refresh_margin
+        self.max_workers = max_workers
+        # Verbindungspool groß genug für parallele Abrufe über dieselbe Session
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.client.http_client.session.mount("https://", adapter)
+        self._worksheets = {}
+        self._prefetched = {}   # sheet_id -> (Future, Spaltentypen, gestartet_um)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sheets")
+        self._lock = threading.Lock()
+        self._auth_lock = threading.Lock()
+
+    def ensure_fresh(self):
+        """Token erneuern, wenn es fehlt oder in Kürze abläuft (ein Handshake für alle Threads)."""
+        http_client = self.client.http_client
+        with self._auth_lock:
+            expiry = getattr(http_client.auth, "expiry", None)
+            if http_client.auth.token is None or expiry is None or expiry - _utcnow() < self.refresh_margin:
+                http_client.login()
+
+    def worksheet(self, sheet_id):
+        """Erstes Tabellenblatt – pro Sheet-ID nur einmal geöffnet."""
+        self.ensure_fresh()
+        with self._lock:
+            sheet = self._worksheets.get(sheet_id)
+        if sheet is None:
+            sheet = self.client.open_by_key(sheet_id).sheet1
+            with self._lock:
+                sheet = self._worksheets.setdefault(sheet_id, sheet)
+        return sheet
+
+    def _read_frame(self, sheet_id, dtypes):
+        return read_sheet_frame(self.worksheet(sheet_id), dtypes)
+
+    def _drop_expired(self):
+        # Nie abgeholte Vorab-Abrufe nicht für die ganze Prozesslaufzeit festhalten (Aufrufer hält _lock)
+        now = time.monotonic()
+        for sheet_id in [k for k, (_, _, started) in self._prefetched.items()
+                         if now - started >= PREFETCH_MAX_AGE_SECONDS]:
+            future, _, _ = self._prefetched.pop(sheet_id)
+            future.cancel()
+
+    def prefetch(self, sheets):
+        """Sheets ({sheet_id: Spaltentypen}) im Hintergrund laden; `read_frame` holt sie später ab.
+
+        Nur sinnvoll, wenn alle Sheets sicher gebraucht werden (z. B. snapshot_sync pull).
+        """
+        self.ensure_fresh()
+        with self._lock:
+            self._drop_expired()
+            for sheet_id, dtypes in sheets.items():
+                if sheet_id not in self._prefetched:
+                    future = self._executor.submit(self._read_frame, sheet_id, dtypes)
+                    self._prefetched[sheet_id] = (future, dtypes, time.monotonic())
+
+    def read_frame(self, sheet_id, dtypes=None):
+        """Tabellenblatt als typisiertes DataFrame (siehe sheet_ingest.read_sheet_frame)."""
+        with self._lock:
+            self._drop_expired()
+            future, prefetched_dtypes, started = self._prefetched.pop(sheet_id, (None, None, 0.0))
+        if (future is not None and prefetched_dtypes == dtypes
+                and time.monotonic() - started < PREFETCH_MAX_AGE_SECONDS):
+            try:
+                return future.result()
+            except Exception as e:
+                print(f"⚠️ Vorab-Abruf von {sheet_id} fehlgeschlagen, lade neu: {e}")
+        return self._read_frame(sheet_id, dtypes)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(creds_dict=None):
+    """Prozessweiter Client pro Service-Account.
+
+    Ohne `creds_dict` kommen die Credentials aus GOOGLE_SHEETS_CREDS oder der lokalen Datei.
+    """
+    if creds_dict is None:
+        creds_json = os.getenv("GOOGLE_SHEETS_CREDS")
+        creds_dict = json.loads(creds_json) if creds_json else None
+    key = creds_dict.get("client_email") if creds_dict else LOCAL_CREDS_PATH
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            if creds_dict:
+                creds = ServiceAccountCredentials.from_json_keyfile_dict(dict(creds_dict), SCOPE)
+            else:
+                creds = ServiceAccountCredentials.from_json_keyfile_name(LOCAL_CREDS_PATH, SCOPE)
+            client = _clients[key] = GoogleClient(creds)
+    return client
+
+
+def get_google_sheet(sheet_id):
+    """Erstes Tabellenblatt öffnen – Credentials aus GOOGLE_SHEETS_CREDS oder lokaler Datei."""
+    return get_client().worksheet(sheet_id)
@@ -0,0 +1,87 @@
+"""Zeitmessung fürs Dashboard: benannte Spans mit Zeilenzahl und Payload-Größe.
+
+Mit PERF_LOG=perf_log.jsonl landet jeder Span als JSON-Zeile in der Datei
+(Standard: aus – die Datei wächst mit jedem Rerun). Auswertung über mehrere
+Deployments hinweg:
+
+    PERF_LOG=perf_log.jsonl streamlit run streamlit_insta_dashboard.py
+    python perf.py perf_log.jsonl        # p50/p95 pro Tab und Span
+"""
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+PERF_LOG = os.getenv("PERF_LOG", "")
+DEPLOYMENT = os.getenv("PERF_DEPLOYMENT", "local")
+
+_write_lock = threading.Lock()
+
+
+class PerfRecorder:
+    """Sammelt die Spans eines Streamlit-Reruns."""
+
+    def __init__(self, log_path=PERF_LOG, measure_bytes=False):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.log_path = log_path
+        # Payload-Größe kostet eine zusätzliche Serialisierung – nur bei Bedarf messen
+        self.measure_bytes = measure_bytes
+        self.spans = []
+        self._flushed = 0
+
+    @contextmanager
+    def span(self, name, tab=None, rows=None):
+        record = {"span": name, "tab": tab, "rows": rows, "bytes": None}
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["ms"] = round((time.perf_counter() - start) * 1000, 2)
+            self.spans.append(record)
+
+    def figure_bytes(self, fig):
+        return len(fig.to_json()) if self.measure_bytes else None
+
+    def frame_bytes(self, df):
+        return int(df.memory_usage(deep=True).sum()) if self.measure_bytes else None
+
+    def as_frame(self):
+        return pd.DataFrame(self.spans, columns=["tab", "span", "ms", "rows", "bytes"])
+
+    def flush(self):
+        """Noch nicht geschriebene Spans als JSON-Zeilen anhängen (auch nach Fragment-Reruns)."""
+        pending = self.spans[self._flushed:]
+        self._flushed = len(self.spans)
+        if not self.log_path or not pending:
+            return
+        ts = datetime.now().isoformat(timespec="seconds")
+        lines = [json.dumps({"ts": ts, "run_id": self.run_id, "deployment": DEPLOYMENT, **s}) for s in pending]
+        try:
+            with _write_lock, open(self.log_path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError as e:
+            print(f"⚠️ Perf-Log nicht schreibbar: {e}")
+
+
+def summarize(log_path=PERF_LOG):
+    """p50/p95 der Laufzeit pro Deployment, Tab und Span."""
+    df = pd.read_json(log_path, lines=True)
+    if df.empty:
+        return df
+    df["tab"] = df["tab"].fillna("-")
+    grouped = df.groupby(["deployment", "tab", "span"])["ms"]
+    return pd.DataFrame({
+        "n": grouped.size(),
+        "p50_ms": grouped.quantile(0.5).round(1),
+        "p95_ms": grouped.quantile(0.95).round(1),
+    }).reset_index()
+
+
+if __name__ == "__main__":
+    print(summarize(sys.argv[1] if len(sys.argv) > 1 else PERF_LOG or "perf_log.jsonl").to_string(index=False))
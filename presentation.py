@@ -0,0 +1,87 @@
+import pandas as pd
+
+# Regex für Tausenderpunkte (1234567 -> 1.234.567), arbeitet auf der ganzen Spalte
+_THOUSANDS = r"\B(?=(\d{3})+(?!\d))"
+MARKER = "👉 "
+
+
+def format_thousands(values):
+    """Ganze Zahlen mit deutschem Tausenderpunkt – vektorisiert statt apply pro Zeile."""
+    return values.fillna(0).astype('int64').astype(str).str.replace(_THOUSANDS, ".", regex=True)
+
+
+def format_dates(values, fmt='%d.%m.%Y'):
+    return pd.to_datetime(values).dt.strftime(fmt)
+
+
+def shorten(values, max_len=20):
+    """Lange Vereinsnamen kürzen ("..." anhängen)."""
+    values = values.astype(str)
+    return values.where(values.str.len() <= max_len, values.str[:max_len] + '...')
+
+
+def build_ranking_display(df_latest, accounts=None):
+    """Anzeige-Tabelle fürs Ranking (Rang, Verein, Link, Follower, Stand) – einmal pro Datenstand.
+
+    Mit `accounts` (URL, REGION, LIGA aus dem Account-Register) kommen die
+    Filterspalten dazu; Vereine ohne Eintrag bleiben leer.
+    """
+    display = pd.DataFrame({
+        'RANG': pd.RangeIndex(1, len(df_latest) + 1).astype(str),
+        'CLUB_NAME': df_latest['CLUB_NAME'].to_numpy(),
+        'URL': df_latest['URL'].to_numpy(),
+        'FOLLOWER': format_thousands(df_latest['FOLLOWER']).to_numpy(),
+        'STAND': format_dates(df_latest['DATE']).to_numpy(),
+    })
+    if accounts is not None:
+        meta = accounts.drop_duplicates('URL').set_index('URL')
+        urls = display['URL'].astype(str).str.strip()
+        for col in ['REGION', 'LIGA']:
+            display[col] = urls.map(meta[col]).fillna("").to_numpy()
+    return display
+
+
+def mark_row(display, club_name):
+    """Markiert den per Chart-Klick gewählten Verein in der Rang-Spalte.
+
+    Ersetzt das zeilenweise Styling: es wird nur die eine Zelle geändert,
+    der Rest der Tabelle bleibt unverändert (keine Styler-Runde pro Klick).
+    """
+    if not club_name:
+        return display
+    mask = (display['CLUB_NAME'] == club_name).to_numpy()
+    if not mask.any():
+        return display
+    display = display.copy()
+    display.loc[mask, 'RANG'] = MARKER + display.loc[mask, 'RANG']
+    return display
+
+
+def match_labels(df):
+    """Achsenbeschriftung "TT.MM.JJJJ (ST n)" für die Heimspiele eines Vereins."""
+    spieltag = df['SPIELTAG'].astype(str).str.replace('.0', '', regex=False)
+    return format_dates(df['DATUM']) + " (ST " + spieltag + ")"
+
+
+def filter_ranking(display, query="", region=None, league=None):
+    """Ranking nach Suchtext (Verein oder Instagram-Name), Region und Liga filtern."""
+    mask = pd.Series(True, index=display.index)
+    query = (query or "").strip()
+    if query:
+        mask &= (display['CLUB_NAME'].str.contains(query, case=False, regex=False)
+                 | display['URL'].str.contains(query, case=False, regex=False))
+    if region and 'REGION' in display.columns:
+        mask &= display['REGION'] == region
+    if league and 'LIGA' in display.columns:
+        mask &= display['LIGA'] == league
+    return display[mask]
+
+
+def page_count(n_rows, page_size):
+    return max(1, -(-n_rows // page_size))
+
+
+def page_slice(display, page, page_size):
+    """Zeilen der Seite `page` (1-basiert) – nur diese werden gerendert."""
+    start = (page - 1) * page_size
+    return display.iloc[start:start + page_size]
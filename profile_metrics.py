@@ -0,0 +1,123 @@
+"""Alle Kennzahlen aus demselben Profilabruf.
+
+`Profile.from_username` lädt die komplette Profilseite – der teure,
+rate-limitierte Teil. Follower sind nur eine Zahl davon. Alles, was ohne
+weiteren Request im Payload steckt, wird mitgeschrieben: als zusätzliche
+Spalten hinter URL, in der Reihenfolge von PROFILE_METRICS.
+
+Gelesen wird direkt aus dem Payload (`profile._node`), nicht über die
+Properties: fehlt dort ein Schlüssel, lädt instaloader sonst still die
+Metadaten per zweitem Request nach (bei eingeloggter Session passiert das
+schon für `profile.followers`). Fehlende Werte bleiben leer.
+
+Schema-Regeln:
+
+    - neue Kennzahlen nur hinten an PROFILE_METRICS anhängen, nie umsortieren
+    - ältere Zeilen sind einfach kürzer; fehlende Spalten lesen sich als
+      "nicht erhoben" (leer/NaN), nicht als 0
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Kennzahl-Arten: Zähler (chartbar), Ja/Nein, Text
+COUNT, FLAG, TEXT = "count", "flag", "text"
+# Pfade der Follower-Zahl im Payload (Legacy-Format bzw. Profilseite)
+FOLLOWER_PATHS = (("edge_followed_by", "count"), ("follower_count",))
+
+
+@dataclass(frozen=True)
+class ProfileMetric:
+    column: str
+    label: str
+    kind: str
+    # Mögliche Fundstellen im Payload, die erste vorhandene gewinnt
+    paths: tuple
+
+
+PROFILE_METRICS = [
+    ProfileMetric('FOLLOWEES', "Gefolgt", COUNT, (("edge_follow", "count"), ("following_count",))),
+    ProfileMetric('MEDIACOUNT', "Beiträge", COUNT, (("edge_owner_to_timeline_media", "count"), ("media_count",))),
+    ProfileMetric('HIGHLIGHT_REELS', "Story-Highlights", COUNT, (("highlight_reel_count",),)),
+    ProfileMetric('IS_VERIFIED', "Verifiziert", FLAG, (("is_verified",),)),
+    ProfileMetric('IS_BUSINESS_ACCOUNT', "Business-Account", FLAG, (("is_business_account",), ("is_business",))),
+    ProfileMetric('IS_PROFESSIONAL_ACCOUNT', "Professional-Account", FLAG, (("is_professional_account",),)),
+    ProfileMetric('IS_PRIVATE', "Privat", FLAG, (("is_private",),)),
+    ProfileMetric('CATEGORY', "Kategorie", TEXT, (("business_category_name",), ("category",))),
+]
+METRIC_COLUMNS = [m.column for m in PROFILE_METRICS]
+CHART_METRICS = [m for m in PROFILE_METRICS if m.kind == COUNT]
+# Spaltentypen für sheet_ingest: leere Zellen bleiben leer (nullable), statt zu 0 zu werden
+METRIC_SHEET_DTYPES = {m.column: {COUNT: 'Int32', FLAG: 'boolean', TEXT: 'category'}[m.kind]
+                       for m in PROFILE_METRICS}
+
+
+def _lookup(node, paths):
+    for path in paths:
+        value = node
+        for key in path:
+            if not isinstance(value, dict) or key not in value:
+                break
+            value = value[key]
+        else:
+            if value is not None:
+                return value
+    return None
+
+
+def follower_count(profile):
+    """Follower aus dem Payload – nur ohne Treffer über die Property (kann nachladen)."""
+    value = _lookup(getattr(profile, "_node", None) or {}, FOLLOWER_PATHS)
+    return int(value) if value is not None else profile.followers
+
+
+def extract_metrics(profile):
+    """Kennzahlen in Spaltenreihenfolge; fehlende Werte als ""."""
+    node = getattr(profile, "_node", None)
+    values = []
+    for metric in PROFILE_METRICS:
+        value = _lookup(node, metric.paths) if node is not None else None
+        if value is None:
+            values.append("")
+        elif metric.kind == COUNT:
+            values.append(int(value))
+        elif metric.kind == FLAG:
+            values.append(bool(value))
+        else:
+            values.append(str(value))
+    return values
+
+
+def coerce_metric_types(df):
+    """Kennzahl-Spalten nullable typisieren (Int64, boolean, Text) – fehlende Spalten werden leer angelegt."""
+    for metric in PROFILE_METRICS:
+        if metric.column not in df.columns:
+            df[metric.column] = pd.Series(pd.NA, index=df.index,
+                                          dtype={COUNT: 'Int64', FLAG: 'boolean', TEXT: 'string'}[metric.kind])
+        elif metric.kind == COUNT:
+            df[metric.column] = pd.to_numeric(df[metric.column].replace("", None), errors='coerce').astype('Int64')
+        elif metric.kind == FLAG:
+            df[metric.column] = df[metric.column].map(as_flag).astype('boolean')
+        else:
+            df[metric.column] = df[metric.column].replace("", None).astype('string')
+    return df
+
+
+def as_flag(value):
+    """Ja/Nein-Zelle -> True/False/NA (TRUE/WAHR/1, FALSE/FALSCH/0 – Sheet-Locale egal)."""
+    if value is None or value is pd.NA or (isinstance(value, float) and np.isnan(value)):
+        return pd.NA
+    if isinstance(value, str):
+        text = value.strip().upper()
+        return {"TRUE": True, "WAHR": True, "1": True, "FALSE": False, "FALSCH": False, "0": False}.get(text, pd.NA)
+    return bool(value)
+
+
+def metric_values(series):
+    """Zähler-Spalte als float64-Array (NaN = nicht erhoben) für Matrix und Charts."""
+    return pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def metric_label(column):
+    return next((m.label for m in PROFILE_METRICS if m.column == column), column)
@@ -0,0 +1,233 @@
+"""Laufbericht des Scrapers: wohin die Zeit eines Laufs gegangen ist.
+
+Pro Lauf entsteht eine JSON-Datei in SCRAPE_REPORT_DIR (Standard:
+run_reports/, leer = aus) mit
+
+    phases     – Laufzeit von Vorbereitung, Abruf, Snapshot und Sortierung
+    workers    – Summe über alle Worker: Abrufzeit (Arbeit), Wartezeit auf das
+                 Budget (Token-Bucket inkl. Rate-Limit-Pause) und Wartezeit in
+                 der Warteschlange (Backoff zwischen Versuchen, Leerlauf)
+    sheets     – jeder Google-Sheets-Aufruf mit Dauer, zusammengefasst pro Methode
+    accounts   – pro Account Versuche, Latenz pro Versuch und Fehlerklassen
+    events     – Rate-Limits, Session-Probleme und Abbruch mit Zeitpunkt im Lauf
+
+Vergleich über mehrere Läufe:
+
+    python run_report.py run_reports     # eine Zeile pro Lauf
+"""
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+DEFAULT_REPORT_DIR = "run_reports"
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+class TimedSheet:
+    """Reicht alle Aufrufe an das Worksheet durch und misst jeden im Bericht."""
+
+    def __init__(self, sheet, report):
+        self._sheet = sheet
+        self._report = report
+
+    def __getattr__(self, name):
+        attr = getattr(self._sheet, name)
+        if not callable(attr):
+            return attr
+
+        def timed(*args, **kwargs):
+            with self._report.sheets_call(name):
+                return attr(*args, **kwargs)
+        return timed
+
+
+class RunReport:
+    """Sammelt die Messwerte eines Scraper-Laufs (thread-sicher, Worker melden parallel)."""
+
+    def __init__(self, report_dir=DEFAULT_REPORT_DIR, label="", config=None):
+        self.report_dir = report_dir
+        self.label = label
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = datetime.now()
+        self.config = config or {}
+        self.error = None
+        self._start = time.monotonic()
+        self._phases = {}
+        self._workers = {"fetch": 0.0, "rate_wait": 0.0, "queue_wait": 0.0}
+        self._sheets = []
+        self._accounts = {}
+        self._events = []
+        self._lock = threading.Lock()
+
+    def _elapsed(self):
+        return round(time.monotonic() - self._start, 3)
+
+    @contextmanager
+    def phase(self, name):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._phases[name] = self._phases.get(name, 0.0) + time.monotonic() - start
+
+    @contextmanager
+    def sheets_call(self, method):
+        start, ok = time.monotonic(), False
+        try:
+            yield
+            ok = True
+        finally:
+            with self._lock:
+                self._sheets.append({"method": method, "seconds": round(time.monotonic() - start, 3), "ok": ok})
+
+    def timed_sheet(self, sheet):
+        return TimedSheet(sheet, self)
+
+    def worker_time(self, kind, seconds):
+        """Zeit eines Workers: "fetch", "rate_wait" oder "queue_wait"."""
+        with self._lock:
+            self._workers[kind] += seconds
+
+    def attempt(self, username, attempt, seconds, error=None, kind=None):
+        """Ein Abrufversuch; `kind` ordnet Fehler ein (rate_limit, session, not_found, other)."""
+        with self._lock:
+            account = self._accounts.setdefault(username, {"username": username, "ok": False, "attempts": 0,
+                                                           "fetch_seconds": [], "errors": []})
+            account["attempts"] = max(account["attempts"], attempt)
+            account["fetch_seconds"].append(round(seconds, 3))
+            if error is None:
+                account["ok"] = True
+            else:
+                account["errors"].append({"attempt": attempt, "kind": kind, "class": type(error).__name__,
+                                          "message": str(error)[:200]})
+
+    def event(self, kind, **details):
+        with self._lock:
+            self._events.append({"t": self._elapsed(), "kind": kind, **details})
+
+    def as_dict(self):
+        with self._lock:
+            accounts = [dict(a) for a in self._accounts.values()]
+            sheets = list(self._sheets)
+            phases = {k: round(v, 3) for k, v in self._phases.items()}
+            workers = {f"{k}_seconds": round(v, 3) for k, v in self._workers.items()}
+            events = list(self._events)
+
+        latencies = [s for a in accounts for s in a["fetch_seconds"]]
+        by_method = {}
+        for call in sheets:
+            entry = by_method.setdefault(call["method"], {"calls": 0, "seconds": 0.0, "max_seconds": 0.0, "failed": 0})
+            entry["calls"] += 1
+            entry["seconds"] = round(entry["seconds"] + call["seconds"], 3)
+            entry["max_seconds"] = max(entry["max_seconds"], call["seconds"])
+            entry["failed"] += not call["ok"]
+        error_kinds = {}
+        for account in accounts:
+            for error in account["errors"]:
+                error_kinds[error["kind"]] = error_kinds.get(error["kind"], 0) + 1
+
+        return {
+            "run_id": self.run_id,
+            "label": self.label,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "total_seconds": self._elapsed(),
+            "error": self.error,
+            "config": self.config,
+            "phases": phases,
+            "workers": workers,
+            "sheets": {"calls": len(sheets), "seconds": round(sum(c["seconds"] for c in sheets), 3),
+                       "by_method": by_method, "log": sheets},
+            "summary": {
+                "accounts": len(accounts),
+                "ok": sum(a["ok"] for a in accounts),
+                "failed": sum(not a["ok"] for a in accounts),
+                "attempts": sum(len(a["fetch_seconds"]) for a in accounts),
+                "fetch_p50_seconds": _percentile(latencies, 0.5),
+                "fetch_p95_seconds": _percentile(latencies, 0.95),
+                "error_kinds": error_kinds,
+                "rate_limits": sum(e["kind"] == "rate_limit" for e in events),
+                "aborted": next((e["reason"] for e in events if e["kind"] == "abort"), None),
+            },
+            "accounts": accounts,
+            "events": events,
+        }
+
+    def format_summary(self, report=None):
+        """Wohin die Zeit ging – als kurze Log-Zeilen."""
+        report = report or self.as_dict()
+        s, w, sheets = report["summary"], report["workers"], report["sheets"]
+        phases = " | ".join(f"{name} {sec:.1f} s" for name, sec in report["phases"].items())
+        methods = ", ".join(f"{m} {e['calls']}× {e['seconds']:.1f} s" for m, e in sheets["by_method"].items())
+        latency = (f"Latenz p50 {s['fetch_p50_seconds']:.2f} s / p95 {s['fetch_p95_seconds']:.2f} s"
+                   if s["fetch_p50_seconds"] is not None else "keine Abrufe")
+        errors = ", ".join(f"{k} {v}×" for k, v in s["error_kinds"].items()) or "keine"
+        lines = [
+            f"⏱️ Laufzeit {report['total_seconds']:.1f} s: {phases}",
+            f"   Worker (Summe): Abruf {w['fetch_seconds']:.1f} s | Budget-Wartezeit {w['rate_wait_seconds']:.1f} s"
+            f" | Backoff/Leerlauf {w['queue_wait_seconds']:.1f} s",
+            f"   Sheets: {sheets['calls']} Aufrufe, {sheets['seconds']:.1f} s" + (f" ({methods})" if methods else ""),
+            f"   Accounts: {s['ok']} ok, {s['failed']} fehlgeschlagen, {s['attempts']} Versuche, {latency}",
+            f"   Fehler: {errors} | Rate-Limits: {s['rate_limits']}",
+        ]
+        if s.get("aborted"):
+            lines.append(f"   🛑 Abgebrochen: {s['aborted']}")
+        return "\n".join(lines)
+
+    def write(self):
+        """Bericht als JSON speichern (Pfad zurück) – ohne Verzeichnis passiert nichts."""
+        if not self.report_dir:
+            return None
+        name = f"scrape_{self.started_at:%Y%m%d-%H%M%S}{'_' + self.label if self.label else ''}.json"
+        path = os.path.join(self.report_dir, name)
+        try:
+            os.makedirs(self.report_dir, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.as_dict(), f, ensure_ascii=False, indent=1)
+        except OSError as e:
+            print(f"⚠️ Laufbericht nicht schreibbar: {e}")
+            return None
+        return path
+
+
+def summarize(report_dir=DEFAULT_REPORT_DIR):
+    """Eine Zeile pro Lauf: Gesamtzeit, Aufteilung und Fehler – zum Vergleichen über Tage."""
+    rows = []
+    for name in sorted(os.listdir(report_dir)):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(report_dir, name), encoding="utf-8") as f:
+            r = json.load(f)
+        rows.append({
+            "started_at": r["started_at"],
+            "label": r["label"],
+            "total_s": r["total_seconds"],
+            "scrape_s": r["phases"].get("scrape"),
+            "fetch_s": r["workers"]["fetch_seconds"],
+            "rate_wait_s": r["workers"]["rate_wait_seconds"],
+            "queue_wait_s": r["workers"]["queue_wait_seconds"],
+            "sheets_s": r["sheets"]["seconds"],
+            "ok": r["summary"]["ok"],
+            "failed": r["summary"]["failed"],
+            "attempts": r["summary"]["attempts"],
+            "p95_s": r["summary"]["fetch_p95_seconds"],
+            "rate_limits": r["summary"]["rate_limits"],
+        })
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    print(summarize(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_REPORT_DIR).to_string(index=False))
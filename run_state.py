@@ -0,0 +1,89 @@
+import json
+import os
+
+from gspread.utils import rowcol_to_a1
+
+DEFAULT_STATE_FILE = "scrape_state.json"
+# So viele Zeilen werden pro Abruf vom Kopf des Sheets gelesen
+HEAD_CHUNK_ROWS = 200
+
+
+def read_head_rows(sheet, since_date, chunk_rows=HEAD_CHUNK_ROWS):
+    """Liest die Zeilen ab `since_date` vom Kopf des (nach DATE absteigend sortierten) Sheets.
+
+    Es wird blockweise gelesen, bis die erste Zeile eines älteren Tages
+    auftaucht – die Kosten hängen damit von der Anzahl der Accounts ab,
+    nicht von der Länge der Historie.
+    Rückgabe: (Header in Großbuchstaben, Liste der Zeilen als Werte-Listen)
+    """
+    header = [str(c).strip().upper() for c in sheet.row_values(1)]
+    if 'DATE' not in header:
+        return header, []
+    date_idx = header.index('DATE')
+    last_col = len(header)
+
+    rows = []
+    start = 2
+    while True:
+        end = start + chunk_rows - 1
+        chunk = sheet.get_values(f"{rowcol_to_a1(start, 1)}:{rowcol_to_a1(end, last_col)}")
+        for row in chunk:
+            row_date = str(row[date_idx]).strip() if date_idx < len(row) else ""
+            # ISO-Datumsstrings lassen sich direkt vergleichen
+            if row_date < since_date:
+                return header, rows
+            rows.append(row)
+        if len(chunk) < chunk_rows:
+            return header, rows
+        start = end + 1
+
+
+def urls_on(header, rows, date):
+    """URLs aller Zeilen vom Tag `date` (eine pro Zeile)."""
+    if 'URL' not in header or 'DATE' not in header:
+        return []
+    url_idx, date_idx = header.index('URL'), header.index('DATE')
+    return [str(row[url_idx]).strip() for row in rows
+            if url_idx < len(row) and str(row[date_idx]).strip() == date]
+
+
+def read_today_block(sheet, today_date, chunk_rows=HEAD_CHUNK_ROWS):
+    """URLs aller heutigen Zeilen (eine pro Zeile) vom Kopf des Sheets."""
+    header, rows = read_head_rows(sheet, today_date, chunk_rows)
+    return urls_on(header, rows, today_date)
+
+
+class RunState:
+    """Kleine lokale Checkpoint-Datei: letztes Scrape-Datum pro URL."""
+
+    def __init__(self, path=DEFAULT_STATE_FILE):
+        self.path = path
+        self.last_scraped = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.last_scraped = json.load(f).get("last_scraped", {})
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Checkpoint {path} nicht lesbar, starte leer: {e}")
+
+    def done_on(self, date):
+        return {url for url, d in self.last_scraped.items() if d == date}
+
+    def mark(self, urls, date):
+        for url in urls:
+            self.last_scraped[url.strip()] = date
+        self.save()
+
+    def reconcile(self, sheet_urls_today, date):
+        """Gleicht den Checkpoint mit dem heutigen Block im Sheet ab (Sheet gewinnt)."""
+        sheet_urls_today = {u.strip() for u in sheet_urls_today}
+        for url in self.done_on(date) - sheet_urls_today:
+            # Steht im Checkpoint, ist aber nie im Sheet angekommen
+            del self.last_scraped[url]
+        self.mark(sheet_urls_today, date)
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"last_scraped": self.last_scraped}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,65 @@
+"""Adaptive Abrufhäufigkeit: wer sich kaum bewegt, wird seltener gescraped.
+
+Aus der Historie im Sheet (Standard: die letzten 28 Tage) wird pro Account die
+durchschnittliche Bewegung pro Tag (Summe der absoluten Tagesänderungen
+durch die Spannweite in Tagen) berechnet. Ein Account wird erst wieder
+abgerufen, wenn in der Zeit voraussichtlich eine sichtbare Änderung
+zusammenkommt:
+
+    Toleranz  = max(MIN_CHANGE, REL_CHANGE * Follower)
+    Intervall = Toleranz / Bewegung pro Tag, begrenzt auf 1..MAX_INTERVAL_DAYS
+
+Schnelle Accounts bleiben damit täglich, kleine oder ruhende rutschen auf
+alle paar Tage. Das Dashboard füllt die übersprungenen Tage mit dem
+letzten Stand auf (siehe follower_history.FollowerMatrix, FILL_LIMIT_DAYS).
+"""
+import numpy as np
+import pandas as pd
+
+DEFAULT_HISTORY_DAYS = 28
+MAX_INTERVAL_DAYS = 7
+MIN_CHANGE = 5          # Follower
+REL_CHANGE = 0.002      # 0,2 % der Accountgröße
+# Weniger Messpunkte reichen nicht für eine Aussage – dann täglich
+MIN_POINTS = 3
+
+
+def history_frame(header, rows):
+    """Sheet-Zeilen (Werte-Listen) -> DataFrame mit URL, DATE, FOLLOWER."""
+    columns = ['URL', 'DATE', 'FOLLOWER']
+    if not set(columns) <= set(header):
+        return pd.DataFrame(columns=columns)
+    idx = [header.index(c) for c in columns]
+    df = pd.DataFrame([[row[i] if i < len(row) else "" for i in idx] for row in rows], columns=columns)
+    df['URL'] = df['URL'].astype(str).str.strip()
+    df['DATE'] = pd.to_datetime(df['DATE'], errors='coerce')
+    df['FOLLOWER'] = pd.to_numeric(df['FOLLOWER'], errors='coerce')
+    return df.dropna().drop_duplicates(subset=['URL', 'DATE'], keep='first')
+
+
+def last_scraped_dates(history):
+    """Letztes Datum pro URL (ISO-String) – überlebt auch Läufe ohne lokalen Checkpoint."""
+    if history.empty:
+        return {}
+    return history.groupby('URL')['DATE'].max().dt.strftime('%Y-%m-%d').to_dict()
+
+
+def adaptive_intervals(history):
+    """Abrufintervall in Tagen pro URL aus Volatilität und Größe."""
+    if history.empty:
+        return {}
+    df = history.sort_values(['URL', 'DATE'])
+    grouped = df.groupby('URL')
+    stats = pd.DataFrame({
+        'points': grouped.size(),
+        'days': (grouped['DATE'].max() - grouped['DATE'].min()).dt.days,
+        'movement': df.assign(d=grouped['FOLLOWER'].diff().abs()).groupby('URL')['d'].sum(),
+        'followers': grouped['FOLLOWER'].last(),
+    })
+    per_day = stats['movement'] / stats['days'].where(stats['days'] > 0)
+    tolerance = np.maximum(MIN_CHANGE, REL_CHANGE * stats['followers'])
+    interval = np.floor(tolerance / per_day)
+    interval = interval.replace(np.inf, MAX_INTERVAL_DAYS).clip(1, MAX_INTERVAL_DAYS)
+    # Zu wenig Historie: lieber täglich, bis das Bild klar ist
+    interval[(stats['points'] < MIN_POINTS) | per_day.isna()] = 1
+    return interval.astype(int).to_dict()
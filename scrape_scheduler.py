@@ -0,0 +1,331 @@
+import heapq
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, List, Optional
+
+import instaloader
+from instaloader.exceptions import (
+    LoginRequiredException,
+    ProfileNotExistsException,
+    TooManyRequestsException,
+)
+
+from profile_metrics import extract_metrics, follower_count
+
+# ================= STANDARDWERTE =================
+# Gesamtbudget für ALLE Worker zusammen (Profilabrufe pro Minute)
+DEFAULT_RATE_PER_MINUTE = 2.0
+DEFAULT_WORKERS = 3
+DEFAULT_MAX_ATTEMPTS = 3
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 600
+# Nach einem 429 / Login-Redirect pausiert der komplette Pool mindestens so lange
+RATE_LIMIT_COOLDOWN_SECONDS = 300
+MIN_RATE_PER_MINUTE = 0.25
+# Notbremse: so viele Rate-Limits in Folge (ohne Erfolg dazwischen) beenden den Lauf
+MAX_CONSECUTIVE_RATE_LIMITS = 3
+# Zeitlimit der Abrufphase: GitHub Actions beendet Jobs nach 6 h, Snapshot und Sortierung brauchen Luft
+DEFAULT_DEADLINE_MINUTES = 300
+
+# Wortgrenzen: "429"/"401"/"login" nicht innerhalb von Usernamen, URLs oder IDs finden
+_RATE_LIMIT_PATTERN = re.compile(r"\b429\b|too many requests|please wait a few minutes|\blogin\b|\b401\b",
+                                 re.IGNORECASE)
+_SESSION_PATTERN = re.compile(r"\blogin\b|\b401\b", re.IGNORECASE)
+
+
+def is_rate_limited(error):
+    """True, wenn Instagram uns drosselt (429) oder auf den Login umleitet."""
+    if isinstance(error, (TooManyRequestsException, LoginRequiredException)):
+        return True
+    return bool(_RATE_LIMIT_PATTERN.search(str(error)))
+
+
+class TokenBucket:
+    """Token-Bucket mit Jitter, der sich bei Rate-Limits selbst verlangsamt.
+
+    Alle Worker teilen sich einen Bucket – die Laufzeit hängt damit nur
+    vom Budget ab, nicht von der Anzahl der Accounts mal fester Pause.
+    """
+
+    def __init__(self, rate_per_minute, burst=1, jitter=0.3):
+        self.base_rate = rate_per_minute / 60.0
+        self.rate = self.base_rate
+        self.capacity = max(1, burst)
+        self.jitter = jitter
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.successes_since_penalty = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, deadline=None, stop=None):
+        """Blockiert, bis ein Token frei ist (inkl. zufälligem Jitter).
+
+        False, wenn das Token erst nach `deadline` (monotonic) frei würde oder
+        `stop` (threading.Event) gesetzt wird – dann wurde nichts verbraucht.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    wait = 0.0
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            if wait <= 0:
+                break
+            if deadline is not None and now + wait > deadline:
+                return False
+            if stop is not None:
+                if stop.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+        # Jitter, damit die Abrufe nicht im exakt gleichen Takt kommen
+        if self.jitter:
+            time.sleep(random.uniform(0, self.jitter / self.rate))
+        return True
+
+    def penalize(self, cooldown=RATE_LIMIT_COOLDOWN_SECONDS):
+        """Rate-Limit erkannt: Pool pausieren und Budget halbieren."""
+        with self._lock:
+            self.rate = max(MIN_RATE_PER_MINUTE / 60.0, self.rate / 2)
+            self.paused_until = max(self.paused_until, time.monotonic() + cooldown)
+            self.tokens = 0.0
+            self.successes_since_penalty = 0
+
+    def reward(self):
+        """Nach einigen Erfolgen in Folge tastet sich das Budget wieder hoch."""
+        with self._lock:
+            self.successes_since_penalty += 1
+            if self.rate < self.base_rate and self.successes_since_penalty >= 5:
+                self.rate = min(self.base_rate, self.rate * 1.25)
+                self.successes_since_penalty = 0
+
+
+def error_kind(error):
+    """Fehlerklasse für den Laufbericht: rate_limit, session, not_found oder other."""
+    if isinstance(error, ProfileNotExistsException):
+        return "not_found"
+    if isinstance(error, LoginRequiredException) or _SESSION_PATTERN.search(str(error)):
+        return "session"
+    if is_rate_limited(error):
+        return "rate_limit"
+    return "other"
+
+
+@dataclass
+class ScrapeResult:
+    username: str
+    profile: Optional[Any] = None
+    attempts: int = 0
+    error: Optional[Exception] = None
+    # Aus dem Payload des Abrufs gelesen (siehe profile_metrics.py)
+    followers: Optional[int] = None
+    metrics: List[Any] = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return self.profile is not None
+
+
+class RunAborted(Exception):
+    """Lauf vorzeitig beendet (Session ungültig, Dauer-Rate-Limit oder Zeitlimit) – Account nicht abgerufen."""
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE_SECONDS, cap=BACKOFF_MAX_SECONDS):
+    """Exponentieller Backoff pro Account mit vollem Jitter."""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class ProfileScheduler:
+    """Worker-Pool für `instaloader.Profile.from_username` mit gemeinsamem Budget.
+
+    `context_factory` liefert pro Worker einen eigenen Instaloader-Kontext,
+    damit sich die Threads keine HTTP-Session teilen müssen.
+
+    Notbremse: Beim ersten Session-Fehler (Login/401), nach
+    `max_consecutive_rate_limits` Rate-Limits in Folge oder wenn
+    `deadline_seconds` abgelaufen sind, wird der Lauf abgebrochen – alle noch
+    offenen Accounts kommen sofort mit RunAborted zurück (`aborted` nennt den
+    Grund). So bleibt Zeit für Snapshot, Aggregate und Sortierung.
+    """
+
+    def __init__(self, context_factory: Callable[[], Any], rate_per_minute=DEFAULT_RATE_PER_MINUTE,
+                 workers=DEFAULT_WORKERS, max_attempts=DEFAULT_MAX_ATTEMPTS, log=print, report=None,
+                 max_consecutive_rate_limits=MAX_CONSECUTIVE_RATE_LIMITS, deadline_seconds=None):
+        self.context_factory = context_factory
+        self.bucket = TokenBucket(rate_per_minute)
+        self.workers = max(1, workers)
+        self.max_attempts = max_attempts
+        self.log = log
+        # Optionaler Laufbericht (run_report.RunReport): Latenz, Versuche, Warte- und Abrufzeit
+        self.report = report
+        self._queue = []  # Heap aus (bereit_ab, reihenfolge, username, versuch)
+        self._cond = threading.Condition()
+        self._open = 0
+        self._results = []
+        self._counter = 0
+        self.max_consecutive_rate_limits = max_consecutive_rate_limits
+        self.deadline_seconds = deadline_seconds
+        self._deadline = None
+        self._consecutive_rate_limits = 0
+        self.aborted = None
+        self._stop = threading.Event()
+
+    def _push(self, ready_at, username, attempt):
+        self._counter += 1
+        heapq.heappush(self._queue, (ready_at, self._counter, username, attempt))
+        self._cond.notify_all()
+
+    def _abort(self, reason):
+        """Lauf beenden: alle wartenden Accounts sofort als nicht abgerufen zurückgeben."""
+        with self._cond:
+            if self.aborted is not None:
+                return
+            self.aborted = reason
+            self._stop.set()
+            pending, self._queue = self._queue, []
+            for _, _, username, attempt in pending:
+                self._open -= 1
+                self._results.append(ScrapeResult(username, attempts=attempt - 1, error=RunAborted(reason)))
+            self._cond.notify_all()
+        self.log(f"🛑 Lauf abgebrochen: {reason}. {len(pending)} Accounts werden nicht mehr abgerufen.")
+        if self.report:
+            self.report.event("abort", reason=reason, skipped=len(pending))
+
+    def _next_task(self):
+        while True:
+            with self._cond:
+                if self._open == 0:
+                    return None
+                now = time.monotonic()
+                # Zeitlimit nur überwachen, solange der Lauf noch nicht abgebrochen ist
+                watch = self._deadline is not None and self.aborted is None
+                if not (watch and now >= self._deadline):
+                    wait = None
+                    if self._queue:
+                        wait = self._queue[0][0] - now
+                        if wait <= 0:
+                            _, _, username, attempt = heapq.heappop(self._queue)
+                            return username, attempt
+                    if watch:
+                        wait = min(wait if wait is not None else float("inf"), self._deadline - now)
+                    self._cond.wait(wait)
+                    continue
+            self._abort(f"Zeitlimit von {self.deadline_seconds / 60:.0f} Minuten erreicht")
+
+    def _finish(self, result):
+        with self._cond:
+            self._open -= 1
+            self._results.append(result)
+            self._cond.notify_all()
+
+    def _measure(self, kind, start):
+        now = time.monotonic()
+        if self.report:
+            self.report.worker_time(kind, now - start)
+        return now
+
+    def _worker(self):
+        context = self.context_factory()
+        while True:
+            started = time.monotonic()
+            task = self._next_task()
+            started = self._measure("queue_wait", started)
+            if task is None:
+                return
+            username, attempt = task
+            acquired = self.bucket.acquire(self._deadline, self._stop)
+            started = self._measure("rate_wait", started)
+            if not acquired:
+                # Budget erst nach dem Zeitlimit frei oder Lauf inzwischen abgebrochen
+                if self.aborted is None:
+                    self._abort(f"Zeitlimit von {self.deadline_seconds / 60:.0f} Minuten erreicht")
+                self._finish(ScrapeResult(username, attempts=attempt - 1, error=RunAborted(self.aborted)))
+                continue
+            try:
+                profile = instaloader.Profile.from_username(context, username)
+                # Alles hier aus dem Payload lesen, damit der Hauptthread nichts mehr nachlädt
+                profile.full_name
+                followers, metrics = follower_count(profile), extract_metrics(profile)
+            except Exception as e:
+                fetch_end = self._measure("fetch", started)
+                kind = error_kind(e)
+                if self.report:
+                    self.report.attempt(username, attempt, fetch_end - started, e, kind)
+                    if kind in ("rate_limit", "session"):
+                        self.report.event(kind, username=username, attempt=attempt, error=type(e).__name__)
+                if kind == "session":
+                    # Abgelaufene Session: weitere Versuche bringen nur Pausen, kein Ergebnis
+                    self._abort(f"Session ungültig ({type(e).__name__}: {e})")
+                elif kind == "rate_limit":
+                    with self._cond:
+                        self._consecutive_rate_limits += 1
+                        streak = self._consecutive_rate_limits
+                    if streak >= self.max_consecutive_rate_limits:
+                        self._abort(f"{streak} Rate-Limits in Folge")
+                    else:
+                        # Bremst den ganzen Pool – auch wenn dieser Account danach aufgegeben wird
+                        self.log(f"🛑 Rate-Limit bei {username}: {e}. Pool wird gebremst.")
+                        self.bucket.penalize()
+                if kind == "not_found" or attempt >= self.max_attempts:
+                    self.log(f"⚠️ Fehler bei {username}: {e}. Versuch {attempt}/{self.max_attempts} – aufgegeben.")
+                    self._finish(ScrapeResult(username, attempts=attempt, error=e))
+                    continue
+                delay = backoff_delay(attempt)
+                with self._cond:
+                    retry = self.aborted is None
+                    if retry:
+                        self._push(time.monotonic() + delay, username, attempt + 1)
+                if retry:
+                    self.log(f"⚠️ Fehler bei {username}: {e}. Versuch {attempt}/{self.max_attempts}, neuer Versuch in {delay:.0f}s...")
+                else:
+                    self._finish(ScrapeResult(username, attempts=attempt, error=e))
+                continue
+            fetch_end = self._measure("fetch", started)
+            if self.report:
+                self.report.attempt(username, attempt, fetch_end - started)
+            with self._cond:
+                self._consecutive_rate_limits = 0
+            self.bucket.reward()
+            self._finish(ScrapeResult(username, profile=profile, attempts=attempt, followers=followers, metrics=metrics))
+
+    def run(self, usernames) -> Iterator[ScrapeResult]:
+        """Liefert die Ergebnisse im Hauptthread, sobald sie fertig sind."""
+        usernames = list(usernames)
+        if not usernames:
+            return
+        with self._cond:
+            self._open = len(usernames)
+            if self.deadline_seconds:
+                self._deadline = time.monotonic() + self.deadline_seconds
+            for username in usernames:
+                self._push(0.0, username, 1)
+
+        threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(min(self.workers, len(usernames)))]
+        for t in threads:
+            t.start()
+
+        delivered = 0
+        while delivered < len(usernames):
+            with self._cond:
+                while not self._results:
+                    self._cond.wait()
+                pending, self._results = self._results, []
+            for result in pending:
+                delivered += 1
+                yield result
+
+        for t in threads:
+            t.join()
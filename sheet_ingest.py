@@ -0,0 +1,118 @@
+"""Sheet -> typisiertes DataFrame in Blöcken, ohne Liste von Dicts.
+
+`get_all_records()` baut pro Zeile ein Dict (Spaltennamen inklusive), daraus
+kopiert pandas ein DataFrame, und danach entstehen beim Umwandeln von DATE
+und FOLLOWER noch einmal neue Spalten. Hier werden stattdessen Rohwerte
+bereichsweise gelesen (CHUNK_ROWS Zeilen pro Abruf) und jeder Block sofort in
+kompakte Spalten umgewandelt; die Rohdaten eines Blocks sind danach weg:
+
+    date       -> Tage seit 1970 als int32 (date32), am Ende als date-Objekte,
+                  die sich alle Zeilen eines Tages teilen
+    int32      -> Ganzzahl (leer/ungültig = 0)
+    Int32      -> Ganzzahl mit Lücken (leer = NA, z. B. Profil-Kennzahlen alter Zeilen)
+    boolean    -> Ja/Nein mit Lücken (TRUE/WAHR, FALSE/FALSCH, leer = NA)
+    category   -> Kategorie (Vereinsnamen, URLs: jeder Text nur einmal im Speicher)
+
+Spalten ohne Typangabe bleiben Text.
+"""
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from profile_metrics import METRIC_SHEET_DTYPES, as_flag
+
+CHUNK_ROWS = 10000
+INSTA_SHEET_DTYPES = {
+    'DATE': 'date',
+    'CLUB_NAME': 'category',
+    'USERNAME': 'category',
+    'FOLLOWER': 'int32',
+    'URL': 'category',
+    **METRIC_SHEET_DTYPES,
+}
+ZUSCHAUER_SHEET_DTYPES = {
+    'HEIM': 'category',
+    'GAST': 'category',
+    'ZUSCHAUER': 'int32',
+    'SPIELTAG': 'int32',
+    # Schnittwerte mit Nachkommastellen: bleibt Text, zuschauer_model wandelt wie bisher per to_numeric
+}
+_EPOCH = date(1970, 1, 1)
+
+
+def _cast_chunk(values, dtype):
+    if dtype == 'date':
+        days = pd.to_datetime(pd.Series(values), errors='coerce').to_numpy().astype('datetime64[D]')
+        # Ungültige Daten (NaT) werden zu einem Sentinel, der beim Zusammenbau herausfällt
+        return np.where(np.isnat(days), np.iinfo(np.int32).min, days.astype(np.int64)).astype(np.int32)
+    if dtype == 'int32':
+        return pd.to_numeric(pd.Series(values), errors='coerce').fillna(0).to_numpy().astype(np.int32)
+    if dtype == 'Int32':
+        return pd.to_numeric(pd.Series(values), errors='coerce').astype('Int32').array
+    if dtype == 'boolean':
+        # Formatierte Werte: je nach Sheet-Locale TRUE/FALSE oder WAHR/FALSCH
+        return pd.Series(values, dtype=object).map(as_flag).astype('boolean').array
+    if dtype == 'category':
+        return pd.Categorical(pd.Series(values, dtype=str).str.strip())
+    return np.array([str(v) for v in values], dtype=object)
+
+
+def _combine(parts, dtype):
+    if dtype == 'date':
+        days = np.concatenate(parts)
+        unique_days, codes = np.unique(days, return_inverse=True)
+        # Ein date-Objekt pro Tag, alle Zeilen zeigen darauf (8 Byte pro Zeile statt eines Objekts)
+        objects = np.array([None if d == np.iinfo(np.int32).min else _EPOCH + timedelta(days=int(d))
+                            for d in unique_days], dtype=object)
+        return objects[codes]
+    if dtype == 'category':
+        return pd.api.types.union_categoricals(parts, sort_categories=True)
+    if dtype in ('Int32', 'boolean'):
+        return pd.concat([pd.Series(p) for p in parts], ignore_index=True).array
+    return np.concatenate(parts)
+
+
+def read_sheet_frame(sheet, dtypes=None, chunk_rows=CHUNK_ROWS):
+    """Ganzes Tabellenblatt als DataFrame mit großgeschriebenen Spaltennamen und festen Typen."""
+    from gspread.utils import rowcol_to_a1
+
+    dtypes = dtypes or {}
+    header = [str(c).strip().upper() for c in sheet.row_values(1)]
+    width = len(header)
+    if not width:
+        return pd.DataFrame()
+    parts = {col: [] for col in header}
+    start = 2
+    while True:
+        end = start + chunk_rows - 1
+        raw = sheet.get_values(f"{rowcol_to_a1(start, 1)}:{rowcol_to_a1(end, width)}")
+        # Leere Zeilen überspringen, kurze Zeilen (leere Zellen am Ende) auffüllen
+        chunk = [row if len(row) == width else (row + [""] * width)[:width] for row in raw if any(row)]
+        if chunk:
+            for i, col in enumerate(header):
+                parts[col].append(_cast_chunk([row[i] for row in chunk], dtypes.get(col)))
+        if len(raw) < chunk_rows:
+            break
+        del raw, chunk
+        start = end + 1
+
+    if not parts[header[0]]:
+        return pd.DataFrame(columns=header)
+    df = pd.DataFrame({col: _combine(parts[col], dtypes.get(col)) for col in header})
+    if 'date' in dtypes.values():
+        date_cols = [c for c, t in dtypes.items() if t == 'date' and c in df.columns]
+        df = df.dropna(subset=date_cols).reset_index(drop=True)
+    return df
+
+
+def coerce_insta_types(df):
+    """DATE als date, FOLLOWER numerisch – nur umwandeln, was noch nicht passt."""
+    if not pd.api.types.is_integer_dtype(df['FOLLOWER']):
+        df['FOLLOWER'] = pd.to_numeric(df['FOLLOWER'], errors='coerce').fillna(0)
+    if 'DATE' not in df.columns:
+        return df
+    first = df['DATE'].iloc[0] if len(df) else None
+    if not isinstance(first, date) or isinstance(first, datetime):
+        df['DATE'] = pd.to_datetime(df['DATE']).dt.date
+    return df
@@ -0,0 +1,102 @@
+import threading
+import time
+
+from gspread.utils import rowcol_to_a1
+
+DEFAULT_BATCH_SIZE = 20
+DEFAULT_FLUSH_SECONDS = 120
+FOLLOWER_COLUMN = 4  # Spalte D, 1-basiert wie bei sheet.sort()
+
+
+def extend_header(sheet, header, columns, log=print):
+    """Fehlende Spaltenköpfe rechts an Zeile 1 anhängen – ältere Sheets kennen nur die ersten Spalten.
+
+    Zeilen werden positionsbasiert geschrieben; ergänzt wird deshalb nur,
+    wenn der vorhandene Header ein Anfang von `columns` ist. Rückgabe: Header danach.
+    """
+    if len(header) >= len(columns):
+        return header
+    if header != columns[:len(header)]:
+        log(f"⚠️ Unerwarteter Sheet-Header {header} – zusätzliche Spalten werden nicht angelegt.")
+        return header
+    if sheet.col_count < len(columns):
+        sheet.add_cols(len(columns) - sheet.col_count)
+    missing = columns[len(header):]
+    sheet.update([missing], f"{rowcol_to_a1(1, len(header) + 1)}:{rowcol_to_a1(1, len(columns))}")
+    log(f"🧩 Neue Spalten im Sheet: {', '.join(missing)}")
+    return list(columns)
+
+
+class BufferedSheetWriter:
+    """Sammelt Zeilen und schreibt sie gebündelt oben ins Sheet.
+
+    Das Sheet ist nach DATE absteigend sortiert. Neue Zeilen (immer vom
+    heutigen Tag) werden deshalb direkt unter dem Header eingefügt – ein
+    API-Call pro Batch statt ein `append_row` pro Profil. Am Ende muss nur
+    der heutige Block nach Followern sortiert werden, nicht die ganze Tabelle.
+
+    Als Context-Manager benutzt, wird der Puffer auch bei einem Absturz
+    noch geschrieben.
+    """
+
+    def __init__(self, sheet, batch_size=DEFAULT_BATCH_SIZE, flush_seconds=DEFAULT_FLUSH_SECONDS,
+                 rows_on_top=0, on_flush=None, log=print, width=0):
+        self.sheet = sheet
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        # Anzahl der heutigen Zeilen, die schon oben im Sheet stehen (z. B. nach Abbruch)
+        self.rows_on_top = rows_on_top
+        self.on_flush = on_flush
+        self.log = log
+        # Breite des Sortierbereichs: Header-Breite, damit ganze Zeilen sortiert werden –
+        # auch wenn dieser Lauf selbst keine Zeile eingefügt hat
+        self.width = width
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, row):
+        with self._lock:
+            self._buffer.append(list(row))
+            self.width = max(self.width, len(row))
+            due = (len(self._buffer) >= self.batch_size
+                   or time.monotonic() - self._last_flush >= self.flush_seconds)
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+            if not rows:
+                return
+            rows.sort(key=lambda r: r[FOLLOWER_COLUMN - 1], reverse=True)
+            try:
+                self.sheet.insert_rows(rows, row=2)
+            except Exception:
+                # Nichts verlieren: Zeilen zurück in den Puffer, Aufrufer entscheidet
+                self._buffer = rows + self._buffer
+                raise
+            self.rows_on_top += len(rows)
+            self._last_flush = time.monotonic()
+        self.log(f"💾 {len(rows)} Zeilen ins Sheet geschrieben.")
+        if self.on_flush:
+            self.on_flush(rows)
+
+    def sort_block(self):
+        """Sortiert nur den heutigen Block (Zeile 2 bis Blockende) nach Followern."""
+        if self.rows_on_top < 2:
+            return
+        last_cell = rowcol_to_a1(1 + self.rows_on_top, max(self.width, FOLLOWER_COLUMN))
+        self.sheet.sort((FOLLOWER_COLUMN, 'des'), range=f"A2:{last_cell}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.flush()
+        except Exception as e:
+            self.log(f"❌ Puffer konnte nicht geschrieben werden ({len(self._buffer)} Zeilen): {e}")
+            if exc_type is None:
+                raise
+        return False
@@ -0,0 +1,156 @@
+import json
+import os
+import uuid
+from datetime import date, datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+
+from profile_metrics import COUNT, FLAG, METRIC_COLUMNS, PROFILE_METRICS, coerce_metric_types
+
+# Lokaler Datenbestand – per SNAPSHOT_DIR auch auf ein Fixture umbiegbar
+DEFAULT_SNAPSHOT_DIR = "data"
+INSTA_DATASET = "insta"
+
+# Spaltenreihenfolge entspricht den Zeilen, die der Scraper ins Sheet schreibt:
+# fünf Grundspalten, dahinter die Profil-Kennzahlen (siehe profile_metrics.py)
+INSTA_COLUMNS = ['DATE', 'CLUB_NAME', 'USERNAME', 'FOLLOWER', 'URL']
+INSTA_ROW_COLUMNS = INSTA_COLUMNS + METRIC_COLUMNS
+INSTA_SCHEMA = pa.schema([
+    ('CLUB_NAME', pa.string()),
+    ('USERNAME', pa.string()),
+    ('FOLLOWER', pa.int64()),
+    ('URL', pa.string()),
+] + [(m.column, {COUNT: pa.int64(), FLAG: pa.bool_()}.get(m.kind, pa.string())) for m in PROFILE_METRICS])
+# DATE steckt nur im Verzeichnisnamen (DATE=2026-01-15), nicht in den Dateien
+DATE_PARTITIONING = ds.partitioning(pa.schema([('DATE', pa.date32())]), flavor="hive")
+
+
+def snapshot_dir():
+    return os.getenv("SNAPSHOT_DIR", DEFAULT_SNAPSHOT_DIR)
+
+
+def _dataset_path(name, base_dir=None):
+    return os.path.join(base_dir or snapshot_dir(), name)
+
+
+def as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.to_datetime(str(value).strip()).date()
+
+
+def has_dataset(name, base_dir=None):
+    path = _dataset_path(name, base_dir)
+    return os.path.isdir(path) and any(os.scandir(path))
+
+
+def insta_rows_to_frame(rows):
+    """Scraper-Zeilen (Listen in Sheet-Reihenfolge) in ein typisiertes DataFrame wandeln."""
+    # Ältere bzw. kürzere Zeilen ohne Kennzahlen: fehlende Zellen bleiben leer
+    width = len(INSTA_ROW_COLUMNS)
+    df = pd.DataFrame([(list(r) + [""] * width)[:width] for r in rows], columns=INSTA_ROW_COLUMNS)
+    df['DATE'] = df['DATE'].map(as_date)
+    df['FOLLOWER'] = pd.to_numeric(df['FOLLOWER'], errors='coerce').fillna(0).astype('int64')
+    for col in ['CLUB_NAME', 'USERNAME', 'URL']:
+        df[col] = df[col].astype(str).str.strip()
+    return coerce_metric_types(df)
+
+
+def append_insta_rows(rows, base_dir=None):
+    """Hängt Zeilen append-only an: pro Datum eine neue Parquet-Datei in DATE=<tag>/."""
+    if not rows:
+        return 0
+    df = insta_rows_to_frame(rows)
+    root = _dataset_path(INSTA_DATASET, base_dir)
+    for day, part in df.groupby('DATE'):
+        part_dir = os.path.join(root, f"DATE={day.isoformat()}")
+        os.makedirs(part_dir, exist_ok=True)
+        table = pa.Table.from_pandas(part.drop(columns='DATE'), schema=INSTA_SCHEMA, preserve_index=False)
+        file_name = f"part-{datetime.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+        tmp_path = os.path.join(part_dir, f".{file_name}.tmp")
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, os.path.join(part_dir, file_name))
+    return len(df)
+
+
+def read_insta(start=None, end=None, base_dir=None, columns=INSTA_COLUMNS):
+    """Liest den Follower-Datenbestand als DataFrame (DATE als date, FOLLOWER als int64).
+
+    Über `start`/`end` werden nur die benötigten Datums-Partitionen geöffnet;
+    die Dateien werden per Memory-Map gelesen. Mit `columns=INSTA_ROW_COLUMNS`
+    kommen die Profil-Kennzahlen dazu – in Dateien von vor ihrer Einführung
+    sind sie leer (NA).
+    """
+    root = _dataset_path(INSTA_DATASET, base_dir)
+    if not has_dataset(INSTA_DATASET, base_dir):
+        df = pd.DataFrame(columns=columns)
+        return coerce_metric_types(df) if set(METRIC_COLUMNS) & set(columns) else df
+    # Festes Schema statt Ableitung aus der ersten Datei: Spalten, die eine Datei nicht hat, werden NULL
+    dataset = ds.dataset(root, format="parquet", partitioning=DATE_PARTITIONING,
+                         schema=pa.schema([('DATE', pa.date32())] + list(INSTA_SCHEMA)),
+                         filesystem=fs.LocalFileSystem(use_mmap=True), exclude_invalid_files=True)
+    condition = None
+    if start is not None:
+        condition = ds.field('DATE') >= pa.scalar(as_date(start), pa.date32())
+    if end is not None:
+        upper = ds.field('DATE') <= pa.scalar(as_date(end), pa.date32())
+        condition = upper if condition is None else condition & upper
+    table = dataset.to_table(columns=list(columns), filter=condition)
+    df = table.to_pandas(date_as_object=True)
+    return coerce_metric_types(df) if set(METRIC_COLUMNS) & set(columns) else df
+
+
+def insta_dates(base_dir=None):
+    """Alle Datums-Partitionen, ohne eine einzige Datei zu öffnen."""
+    root = _dataset_path(INSTA_DATASET, base_dir)
+    if not os.path.isdir(root):
+        return []
+    return sorted(as_date(e.name.split('=', 1)[1]) for e in os.scandir(root)
+                  if e.is_dir() and e.name.startswith('DATE='))
+
+
+def write_table_snapshot(name, df, base_dir=None):
+    """Kleine Tabellen ohne Zeitachse (z. B. Zuschauer) komplett als eine Datei ersetzen."""
+    path = _dataset_path(name, base_dir)
+    os.makedirs(path, exist_ok=True)
+    tmp_path = os.path.join(path, ".snapshot.parquet.tmp")
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path)
+    os.replace(tmp_path, os.path.join(path, "snapshot.parquet"))
+
+
+def read_table_snapshot(name, base_dir=None):
+    path = os.path.join(_dataset_path(name, base_dir), "snapshot.parquet")
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    return pq.read_table(path, memory_map=True).to_pandas(date_as_object=True)
+
+
+def _manifest_path(base_dir=None):
+    return os.path.join(base_dir or snapshot_dir(), "manifest.json")
+
+
+def bump_version(base_dir=None):
+    """Neue Datenversion markieren – das Dashboard lädt daraufhin im Hintergrund nach."""
+    path = _manifest_path(base_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    manifest = {"version": uuid.uuid4().hex, "updated_at": datetime.now().isoformat(timespec="seconds")}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, path)
+    return manifest["version"]
+
+
+def read_version(base_dir=None):
+    """Aktuelle Datenversion oder None, wenn es (noch) keinen lokalen Bestand gibt."""
+    try:
+        with open(_manifest_path(base_dir), encoding="utf-8") as f:
+            return json.load(f).get("version")
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,97 @@
+"""Abgleich zwischen lokalem Snapshot-Datenbestand und Google Sheets.
+
+    python snapshot_sync.py pull            # Sheets -> lokal (Erstbefüllung, Zuschauer)
+    python snapshot_sync.py push --days 3   # lokal -> Insta-Sheet (fehlende Zeilen nachtragen)
+"""
+import argparse
+from datetime import timedelta
+
+from gspread.utils import rowcol_to_a1
+
+from aggregates import update_aggregates
+from google_sheets import get_client, get_google_sheet
+from run_state import read_head_rows
+from sheet_ingest import ZUSCHAUER_SHEET_DTYPES
+from profile_metrics import METRIC_COLUMNS
+from sheet_writer import BufferedSheetWriter, extend_header
+from snapshot_store import (
+    INSTA_COLUMNS, INSTA_ROW_COLUMNS, append_insta_rows, bump_version, insta_dates, read_insta,
+    write_table_snapshot,
+)
+
+INSTA_SHEET_ID = "1mUEIohJzfZj_MtmYpn5E3URnw9ykfHErd5dfoZVnNSo"
+ZUSCHAUER_SHEET_ID = "1XlYwkPUbhi2STlLJvRAGzB_sp9-HKzoUv9GNMXjhm20"
+ZUSCHAUER_DATASET = "zuschauer"
+
+
+def pull_insta():
+    """Übernimmt alle Tage aus dem Sheet, die lokal noch fehlen."""
+    sheet = get_google_sheet(INSTA_SHEET_ID)
+    values = sheet.get_all_values()[1:]
+    known = {d.isoformat() for d in insta_dates()}
+    # Spalten positionsbasiert, genau so wie der Scraper sie schreibt
+    rows = [r for r in values if r and str(r[0]).strip() and str(r[0]).strip() not in known]
+    written = append_insta_rows(rows)
+    print(f"📥 Insta: {written} Zeilen lokal übernommen.")
+    if written:
+        update_aggregates()
+        bump_version()
+
+
+def pull_zuschauer():
+    # Holt einen laufenden Vorab-Abruf ab (siehe pull), sonst wird direkt geladen
+    df = get_client().read_frame(ZUSCHAUER_SHEET_ID, ZUSCHAUER_SHEET_DTYPES)
+    write_table_snapshot(ZUSCHAUER_DATASET, df)
+    bump_version()
+    print(f"📥 Zuschauer: {len(df)} Zeilen lokal gespeichert.")
+
+
+def push_insta(days=1):
+    """Trägt lokale Zeilen der letzten `days` Tage nach, die im Sheet fehlen."""
+    dates = insta_dates()
+    if not dates:
+        print("ℹ️ Lokal keine Daten vorhanden.")
+        return
+    since = dates[-1] - timedelta(days=days - 1)
+    df_local = read_insta(start=since, columns=INSTA_ROW_COLUMNS).drop_duplicates(subset=['DATE', 'URL'], keep='last')
+    # Kennzahlen als Zellen: nicht erhobene Werte bleiben im Sheet leer
+    metric_cells = df_local[METRIC_COLUMNS].astype(object).where(df_local[METRIC_COLUMNS].notna(), "").values.tolist()
+
+    sheet = get_google_sheet(INSTA_SHEET_ID)
+    header, head_rows = read_head_rows(sheet, since.isoformat())
+    date_idx, url_idx = header.index('DATE'), header.index('URL')
+    in_sheet = {(str(r[date_idx]).strip(), str(r[url_idx]).strip()) for r in head_rows if len(r) > url_idx}
+
+    missing = [
+        [row.DATE.isoformat(), row.CLUB_NAME, row.USERNAME, int(row.FOLLOWER), row.URL] + metrics
+        for row, metrics in zip(df_local[INSTA_COLUMNS].itertuples(index=False), metric_cells)
+        if (row.DATE.isoformat(), row.URL) not in in_sheet
+    ]
+    if not missing:
+        print("✅ Sheet ist aktuell.")
+        return
+
+    header = extend_header(sheet, header, INSTA_ROW_COLUMNS)
+    with BufferedSheetWriter(sheet, batch_size=len(missing), rows_on_top=len(head_rows), width=len(header)) as writer:
+        for row in missing:
+            writer.add(row)
+    # Nachgetragene Tage können älter sein als der Kopf – nur diesen Block neu sortieren
+    # Volle Sheet-Breite (inkl. Spalten hinter unseren Kennzahlen), sonst verrutschen Zeilenteile
+    block_end = rowcol_to_a1(1 + writer.rows_on_top, len(header))
+    sheet.sort((1, 'des'), (4, 'des'), range=f"A2:{block_end}")
+    print(f"📤 {len(missing)} Zeilen ins Sheet nachgetragen.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("direction", choices=["pull", "push"])
+    parser.add_argument("--days", type=int, default=1, help="push: so viele Tage rückwirkend abgleichen")
+    args = parser.parse_args()
+
+    if args.direction == "pull":
+        # Zuschauer-Sheet parallel zum Insta-Sheet laden – gleiche Session, ein Token
+        get_client().prefetch({ZUSCHAUER_SHEET_ID: ZUSCHAUER_SHEET_DTYPES})
+        pull_insta()
+        pull_zuschauer()
+    else:
+        push_insta(args.days)
@@ -0,0 +1,55 @@
+"""Vorab verkleinerte Bilder für den schnellen ersten Seitenaufbau.
+
+Das Banner liegt als 1792 px breites PNG (1,6 MB) im Repo, angezeigt wird es
+mit 450 px. Einmal beim Build (oder nach einem neuen Banner) erzeugt
+
+    python static_assets.py
+
+eine WebP-Version in doppelter Anzeigebreite (scharf auf Retina-Displays)
+unter static/. Streamlit liefert den Ordner bei `server.enableStaticServing`
+als statische Dateien aus – der Browser cacht sie, und pro Rerun läuft kein
+Bild mehr durch Streamlit. Pillow wird nur hier gebraucht (kommt mit
+Streamlit mit), nicht im Dashboard.
+"""
+import os
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(APP_DIR, "static")
+
+BANNER_SOURCE = os.path.join(APP_DIR, "banner_statistik_dashboard.png")
+BANNER_ASSET = "banner_statistik_dashboard.webp"
+BANNER_WIDTH = 450
+WEBP_QUALITY = 85
+
+
+def asset_path(name):
+    return os.path.join(STATIC_DIR, name)
+
+
+def banner_image(static_serving):
+    """Was `st.image` zeigen soll: statische URL, sonst lokale Datei (optimiert, wenn vorhanden)."""
+    if os.path.exists(asset_path(BANNER_ASSET)):
+        return f"/app/static/{BANNER_ASSET}" if static_serving else asset_path(BANNER_ASSET)
+    return BANNER_SOURCE
+
+
+def build_banner(source=BANNER_SOURCE, target=None, width=BANNER_WIDTH * 2, quality=WEBP_QUALITY):
+    from PIL import Image
+
+    target = target or asset_path(BANNER_ASSET)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with Image.open(source) as image:
+        if image.width > width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        image.save(target, "WEBP", quality=quality, method=6)
+    return target
+
+
+def main():
+    target = build_banner()
+    print(f"🖼️ {os.path.relpath(target, APP_DIR)}: {os.path.getsize(BANNER_SOURCE) / 1e6:.2f} MB -> "
+          f"{os.path.getsize(target) / 1e3:.0f} kB")
+
+
+if __name__ == "__main__":
+    main()
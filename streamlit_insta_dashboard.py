@@ -1,17 +1,45 @@
 import streamlit as st
 import pandas as pd
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+import numpy as np
+import os
 import plotly.express as px
-from datetime import datetime, timedelta
 import streamlit.components.v1 as components
+from snapshot_store import INSTA_DATASET, INSTA_ROW_COLUMNS, has_dataset, read_insta, read_table_snapshot, read_version
+from data_cache import SharedDataCache
+from figure_cache import FigureCache
+from sheet_ingest import INSTA_SHEET_DTYPES, ZUSCHAUER_SHEET_DTYPES, coerce_insta_types
+from aggregates import load_aggregates
+from follower_history import FollowerMatrix, GROWTH_WINDOWS, DEFAULT_WINDOW, window_reference_date
+from profile_metrics import metric_label
+from downsampling import prepare_timeseries
+from presentation import build_ranking_display, mark_row, shorten, filter_ranking, page_count, page_slice
+from account_registry import DEFAULT_ACCOUNTS_FILE, accounts_frame, load_accounts
+from perf import PerfRecorder
+from static_assets import banner_image
 
 # --- Konfiguration ---
 INSTA_SHEET_ID = "1mUEIohJzfZj_MtmYpn5E3URnw9ykfHErd5dfoZVnNSo"
 ZUSCHAUER_SHEET_ID = "1XlYwkPUbhi2STlLJvRAGzB_sp9-HKzoUv9GNMXjhm20"
+# Lokale Snapshots (siehe snapshot_sync.py) haben Vorrang vor dem Sheet
+LOCAL_DATASETS = {INSTA_SHEET_ID: INSTA_DATASET, ZUSCHAUER_SHEET_ID: "zuschauer"}
+# Unter diesen Schlüsseln liegen die aus den Sheets gebauten Daten im SharedDataCache
+SHEET_CACHE_KEYS = {INSTA_SHEET_ID: ("follower_matrix", INSTA_SHEET_ID), ZUSCHAUER_SHEET_ID: ("zuschauer_model", ZUSCHAUER_SHEET_ID)}
+# Spaltentypen beim blockweisen Einlesen (siehe sheet_ingest.py); ohne Eintrag bleibt alles Text
+SHEET_DTYPES = {INSTA_SHEET_ID: INSTA_SHEET_DTYPES, ZUSCHAUER_SHEET_ID: ZUSCHAUER_SHEET_DTYPES}
+
+# Ranking: so viele Vereine pro Seite; Region/Liga kommen aus dem Account-Register
+RANKING_PAGE_SIZE = 25
+ACCOUNTS_FILE = os.getenv("ACCOUNTS_FILE", DEFAULT_ACCOUNTS_FILE)
+ALLE = "Alle"
+# Zuschauer-Auswertung (früher ungenutzt in zuschauer_parked.py) erst nach Freigabe zeigen: ZUSCHAUER_TAB=1
+ZUSCHAUER_TAB = os.getenv("ZUSCHAUER_TAB", "0") == "1"
 
 st.set_page_config(page_title="Futsal Statistik Dashboard", layout="wide")
 
+# Zeitmessung dieses Reruns; Panel und Payload-Größen nur mit ?perf=1
+show_perf = st.query_params.get("perf") == "1"
+perf = PerfRecorder(measure_bytes=show_perf)
+
 # --- STYLING ---
 st.markdown("""
 <style>
@@ -39,280 +67,421 @@ def scroll_to_anchor():
     components.html(js, height=0)
 
 # --- DATEN LADEN FUNKTION ---
-@st.cache_data(ttl=3600)
-def load_data(sheet_id, secret_key):
+@st.cache_resource
+def get_data_cache():
+    # Ein Cache für alle Sessions; neue Daten erkennt er an der Versionsmarke des Scrapers
+    return SharedDataCache(read_version)
+
+@st.cache_resource
+def get_figure_cache():
+    # Fertige Chart-Specs für alle Sessions, Schlüssel (Datenstand, Chart, Auswahl)
+    return FigureCache()
+
+def fetch_data(sheet_id, secret_key):
+    dataset = LOCAL_DATASETS.get(sheet_id)
+    if dataset and has_dataset(dataset):
+        try:
+            # Profil-Kennzahlen gleich mitlesen – die Matrix hält sie für die Detailanalyse bereit
+            df = read_insta(columns=INSTA_ROW_COLUMNS) if dataset == INSTA_DATASET else read_table_snapshot(dataset)
+            if not df.empty:
+                return df
+        except Exception as e:
+            print(f"⚠️ Lokaler Snapshot nicht lesbar, lade aus Google Sheets: {e}")
+    # gspread/oauth2client erst laden, wenn wirklich aus Google Sheets gelesen wird
+    from google_sheets import get_client
+    # Eine autorisierte Session für alle Sessions und Sheets (Token-Refresh, Keep-Alive)
+    client = get_client(dict(st.secrets[secret_key]))
+    # Kein Vorab-Laden der anderen Sheets: jeder Reiter lädt seine Daten erst, wenn er geöffnet wird
+    return client.read_frame(sheet_id, SHEET_DTYPES.get(sheet_id))
+
+def fetch_follower_matrix():
+    # Aus dem Sheet kommen DATE/FOLLOWER schon typisiert, aus dem Snapshot ebenso – dann kein Umbau
+    return FollowerMatrix(coerce_insta_types(fetch_data(INSTA_SHEET_ID, "gcp_service_account")))
+
+def load_follower_matrix():
+    # Einmal pro Datenstand gebaut und von allen Sessions nur gelesen – kein Kopieren, Sortieren, Deduplizieren pro Rerun
     try:
-        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        creds_dict = st.secrets[secret_key]
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-        client = gspread.authorize(creds)
-        sheet = client.open_by_key(sheet_id).sheet1
-        data = sheet.get_all_records()
-        df = pd.DataFrame(data)
-        df.columns = [str(c).strip().upper() for c in df.columns]
-        return df
+        return get_data_cache().get_stamped(SHEET_CACHE_KEYS[INSTA_SHEET_ID], fetch_follower_matrix)
     except Exception as e:
         st.error(f"Fehler beim Laden der Daten: {e}")
-        return pd.DataFrame()
+        return FollowerMatrix(pd.DataFrame(columns=['CLUB_NAME', 'DATE', 'FOLLOWER'])), None
 
-# ==========================================
-# 1. DATEN-VORBEREITUNG (INSTAGRAM)
-# ==========================================
-df_insta = load_data(INSTA_SHEET_ID, "gcp_service_account")
+def fetch_insta_aggregates():
+    # Nur zusammen mit dem lokalen Snapshot gültig – beim Sheet-Fallback wird live gerechnet
+    if not has_dataset(INSTA_DATASET):
+        return None
+    return load_aggregates()
 
-if not df_insta.empty:
-    if 'DATE' in df_insta.columns: 
-        df_insta['DATE'] = pd.to_datetime(df_insta['DATE']).dt.date
-    df_insta['FOLLOWER'] = pd.to_numeric(df_insta['FOLLOWER'], errors='coerce').fillna(0)
-    df_insta = df_insta.sort_values(by=['CLUB_NAME', 'DATE']).drop_duplicates(subset=['CLUB_NAME', 'DATE'], keep='last')
-    
-    df_latest = df_insta.sort_values('DATE').groupby('CLUB_NAME').last().reset_index().sort_values(by='FOLLOWER', ascending=False)
-    summe_follower = f"{int(df_latest['FOLLOWER'].sum()):,}".replace(",", ".")
-    akt_datum = df_insta['DATE'].max().strftime('%d.%m.%Y')
-else:
-    summe_follower, akt_datum = "0", "-"
+def load_insta_aggregates():
+    return get_data_cache().get_stamped(("aggregates", INSTA_SHEET_ID), fetch_insta_aggregates)
 
-# Header-Bereich
+def load_zuschauer_model():
+    # Modell wird zusammen mit den Daten geladen und teilt sich deren Datenstand
+    from zuschauer_model import AttendanceModel
+    try:
+        return get_data_cache().get_stamped(
+            SHEET_CACHE_KEYS[ZUSCHAUER_SHEET_ID],
+            lambda: AttendanceModel(fetch_data(ZUSCHAUER_SHEET_ID, "gcp_service_account")),
+        )
+    except Exception as e:
+        st.error(f"Fehler beim Laden der Daten: {e}")
+        return None, None
+
+@st.cache_data(ttl=600)
+def load_account_meta():
+    try:
+        return accounts_frame(load_accounts(ACCOUNTS_FILE))
+    except OSError as e:
+        print(f"⚠️ Account-Register nicht lesbar, Ranking ohne Region/Liga: {e}")
+        return None
+
+@st.cache_data
+def get_ranking_display(df_latest, accounts):
+    # Formatierte Anzeige-Tabelle nur einmal pro Datenstand bauen
+    return build_ranking_display(df_latest, accounts)
+
+# Header-Bereich – vor dem Datenladen, damit neue Besucher sofort etwas sehen
 try: 
-    st.image("banner_statistik_dashboard.png", width=450)
+    st.image(banner_image(st.get_option("server.enableStaticServing")), width=450)
 except: 
     st.title("⚽ Futsal Dashboard") 
 
+# ==========================================
+# 1. DATEN-VORBEREITUNG (INSTAGRAM)
+# ==========================================
+with perf.span("load_data", tab="insta") as sp:
+    matrix, matrix_stamp = load_follower_matrix()
+    insta_aggregates, aggregates_stamp = load_insta_aggregates()
+    # Charts im FigureCache gelten genau für diesen Datenstand
+    data_version = (matrix_stamp, aggregates_stamp)
+    sp["rows"] = matrix.rows
+
+with perf.span("insta_prep", tab="insta", rows=matrix.rows):
+    if not matrix.empty:
+        if insta_aggregates:
+            df_latest = insta_aggregates['ranking'].copy()
+        else:
+            df_latest = matrix.ranking()
+        summe_follower = f"{int(df_latest['FOLLOWER'].sum()):,}".replace(",", ".")
+        akt_datum = matrix.latest_date.strftime('%d.%m.%Y')
+    else:
+        summe_follower, akt_datum = "0", "-"
+
 st.markdown(f"[www.misterfutsal.de](https://www.misterfutsal.de) | :grey[Stand {akt_datum}]")
 st.divider()
 
 # ==========================================
-# 2. REITER / TABS
+# 2. ANSICHTEN (FRAGMENTE)
 # ==========================================
-tab_insta, tab_zuschauer = st.tabs(["📸 Instagram Follower", "🏟️ Bundesliga Zuschauer"])
+# Klicks in Charts/Tabelle laufen als Fragment-Rerun nur durch diesen Bereich
+@st.fragment
+def render_insta_interaktiv():
+    df_latest_display = get_ranking_display(df_latest, load_account_meta())
+    figures = get_figure_cache()
+    
+    # --- TEIL 1: WACHSTUMSTRENDS ---
+    zeitraum = st.radio("Zeitraum", list(GROWTH_WINDOWS), index=list(GROWTH_WINDOWS).index(DEFAULT_WINDOW),
+                        horizontal=True, key="growth_window")
+    ref_day = window_reference_date(zeitraum, matrix.latest_date, matrix.first_date)
+    if insta_aggregates:
+        df_trend = insta_aggregates['trend']
+        df_trend = df_trend[df_trend['WINDOW'] == zeitraum].copy()
+    else:
+        df_trend = matrix.growth(ref_day)
+    
+    # Namen kürzen
+    df_trend['CLUB_NAME_SHORT'] = shorten(df_trend['CLUB_NAME'])
 
-# --- TAB 1: INSTAGRAM ---
-with tab_insta:
-    if not df_insta.empty:
-        df_latest.insert(0, 'RANG', range(1, len(df_latest) + 1))
-        df_latest_display = df_latest.copy()
-        df_latest_display['RANG'] = df_latest_display['RANG'].astype(str)
-        df_latest_display['FOLLOWER'] = df_latest_display['FOLLOWER'].apply(lambda x: f"{int(x):,}".replace(",", "."))
-        df_latest_display['STAND'] = df_latest_display['DATE'].apply(lambda x: x.strftime('%d.%m.%Y'))
-        
-        # --- TEIL 1: WACHSTUMSTRENDS ---
-        latest_date_global = df_insta['DATE'].max()
-        target_date_4w = latest_date_global - timedelta(weeks=4)
-        available_dates = sorted(df_insta['DATE'].unique())
-        closest_old_date = min(available_dates, key=lambda x: x if x <= target_date_4w else available_dates[0])
-        
-        df_then = df_insta[df_insta['DATE'] == closest_old_date][['CLUB_NAME', 'FOLLOWER']]
-        df_trend = pd.merge(df_latest[['CLUB_NAME', 'FOLLOWER']], df_then, on='CLUB_NAME', suffixes=('_neu', '_alt'))
-        df_trend['Zuwachs'] = df_trend['FOLLOWER_neu'] - df_trend['FOLLOWER_alt']
-        
-        # Namen kürzen
-        df_trend['CLUB_NAME_SHORT'] = df_trend['CLUB_NAME'].apply(lambda x: x[:20] + '...' if len(x) > 20 else x)
+    # STATE INITIALISIERUNG FÜR KLICK-EVENT
+    if 'selected_club_from_chart' not in st.session_state:
+        st.session_state.selected_club_from_chart = None
+    # Tabellen-Auswahl über alle Seiten und Filter hinweg (Reihenfolge der Auswahl)
+    if 'ranking_selection' not in st.session_state:
+        st.session_state.ranking_selection = []
+    # Teil des Editor-Keys: hochzählen verwirft die gemerkten Häkchen aller Tabellenseiten
+    if 'ranking_editor_reset' not in st.session_state:
+        st.session_state.ranking_editor_reset = 0
 
-        # STATE INITIALISIERUNG FÜR KLICK-EVENT
-        if 'selected_club_from_chart' not in st.session_state:
-            st.session_state.selected_club_from_chart = None
+    def focus_ranking_on(club_name):
+        # Filter zurücksetzen und auf die Seite des Vereins springen
+        st.session_state.ranking_search = ""
+        st.session_state.ranking_region = ALLE
+        st.session_state.ranking_liga = ALLE
+        pos = np.flatnonzero((df_latest_display['CLUB_NAME'] == club_name).to_numpy())
+        if len(pos):
+            st.session_state.ranking_page = int(pos[0]) // RANKING_PAGE_SIZE + 1
 
-        top_row_col1, top_row_col2 = st.columns(2, gap="medium")
+    top_row_col1, top_row_col2 = st.columns(2, gap="medium")
 
-        # --- FUNKTION: ROBUSTE AUSWERTUNG DES KLICKS ---
-        def handle_chart_selection(event_data):
-            if not event_data:
-                return False
-            
-            try:
-                # Versuch 1: Normaler Streamlit Objekt-Zugriff
-                points = event_data.selection.points
-            except AttributeError:
-                # Versuch 2: Falls es ein Dictionary ist
-                try:
-                    points = event_data["selection"]["points"]
-                except (KeyError, TypeError):
-                    return False
-            
-            if points:
-                first_point = points[0]
-                if "customdata" in first_point:
-                    selected_name = first_point["customdata"][0]
-                    # Nur aktualisieren, wenn es ein neuer Verein ist
-                    if st.session_state.selected_club_from_chart != selected_name:
-                        st.session_state.selected_club_from_chart = selected_name
-                        return True
+    # --- FUNKTION: ROBUSTE AUSWERTUNG DES KLICKS ---
+    def handle_chart_selection(event_data):
+        if not event_data:
             return False
+        
+        try:
+            # Versuch 1: Normaler Streamlit Objekt-Zugriff
+            points = event_data.selection.points
+        except AttributeError:
+            # Versuch 2: Falls es ein Dictionary ist
+            try:
+                points = event_data["selection"]["points"]
+            except (KeyError, TypeError):
+                return False
+        
+        if points:
+            first_point = points[0]
+            if "customdata" in first_point:
+                selected_name = first_point["customdata"][0]
+                # Nur aktualisieren, wenn es ein neuer Verein ist
+                if st.session_state.selected_club_from_chart != selected_name:
+                    st.session_state.selected_club_from_chart = selected_name
+                    focus_ranking_on(selected_name)
+                    return True
+        return False
 
-        with top_row_col1:
-            # Top 10 Gewinner
-            fig_win = px.bar(
-                df_trend.sort_values(by='Zuwachs', ascending=False).head(10), 
-                x='Zuwachs', y='CLUB_NAME_SHORT', 
-                orientation='h', 
-                title="🚀 Top 10 Gewinner seit dem 15.01.2026 (Klickbar)", 
-                color_discrete_sequence=['#00CC96'], 
-                text='Zuwachs',
-                custom_data=['CLUB_NAME'] 
-            )
-            
-            # Layout aktualisieren: Zoom sperren, aber Klickbarkeit erhalten
-            fig_win.update_layout(
-                yaxis={
-                    'categoryorder': 'total ascending',
-                    'fixedrange': True  # 🔒 Verhindert Zoom auf Y-Achse
-                },
-                xaxis={
-                    'fixedrange': True  # 🔒 Verhindert Zoom auf X-Achse
-                },
-                yaxis_title=None,
-                clickmode='event+select',
-                dragmode=False,         # 🔒 Verhindert das Ziehen/Maus-Selektieren
-                margin=dict(l=0, r=0, t=40, b=0) # Optional: Ränder optimieren
-            )
-            
-            fig_win.update_traces(textposition='inside', insidetextanchor='start', textfont_color='black', textangle=0)
-            
-            # Event Listener
-            event_win = st.plotly_chart(fig_win, use_container_width=True, on_select="rerun", selection_mode="points", key="chart_win")
-            if handle_chart_selection(event_win):
-                scroll_to_anchor()
-
-        with top_row_col2:
-            # Geringstes Wachstum
-            fig_loss = px.bar(
-                df_trend.sort_values(by='Zuwachs', ascending=True).head(10), 
-                x='Zuwachs', y='CLUB_NAME_SHORT', 
-                orientation='h', 
-                title="📉 Geringstes Wachstum seit dem 15.01.2026 (Klickbar)", 
-                color_discrete_sequence=['#FF4B4B'], 
-                text='Zuwachs',
-                custom_data=['CLUB_NAME'] 
-            )
-            
-            # Layout aktualisieren: Zoom sperren, Interaktion beschränken
-            fig_loss.update_layout(
-                yaxis={
-                    'categoryorder': 'total descending',
-                    'fixedrange': True  # 🔒 Verhindert Zoom auf Y-Achse
-                },
-                xaxis={
-                    'fixedrange': True  # 🔒 Verhindert Zoom auf X-Achse
-                },
-                yaxis_title=None,
-                clickmode='event+select',
-                dragmode=False,          # 🔒 Verhindert das Ziehen/Maus-Selektieren
-                margin=dict(l=0, r=0, t=40, b=0)
-            )
-            fig_loss.update_traces(textposition='inside', insidetextanchor='start', textfont_color='black', textangle=-0)
-            
-            # Event Listener
-            event_loss = st.plotly_chart(fig_loss, use_container_width=True, on_select="rerun", selection_mode="points", key="chart_loss")
-            if handle_chart_selection(event_loss):
-                scroll_to_anchor()
-
-        st.divider()
+    with top_row_col1:
+        # Top 10 Gewinner
+        with perf.span("fig_win", tab="insta", rows=len(df_trend)) as sp:
+            def build_fig_win():
+                fig_win = px.bar(
+                    df_trend.sort_values(by='Zuwachs', ascending=False).head(10), 
+                    x='Zuwachs', y='CLUB_NAME_SHORT', 
+                    orientation='h', 
+                    title=f"🚀 Top 10 Gewinner seit dem {ref_day:%d.%m.%Y} (Klickbar)", 
+                    color_discrete_sequence=['#00CC96'], 
+                    text='Zuwachs',
+                    custom_data=['CLUB_NAME'] 
+                )
+        
+                # Layout aktualisieren: Zoom sperren, aber Klickbarkeit erhalten
+                fig_win.update_layout(
+                    yaxis={
+                        'categoryorder': 'total ascending',
+                        'fixedrange': True  # 🔒 Verhindert Zoom auf Y-Achse
+                    },
+                    xaxis={
+                        'fixedrange': True  # 🔒 Verhindert Zoom auf X-Achse
+                    },
+                    yaxis_title=None,
+                    clickmode='event+select',
+                    dragmode=False,         # 🔒 Verhindert das Ziehen/Maus-Selektieren
+                    margin=dict(l=0, r=0, t=40, b=0) # Optional: Ränder optimieren
+                )
+        
+                fig_win.update_traces(textposition='inside', insidetextanchor='start', textfont_color='black', textangle=0)
+                return fig_win
+            fig_win = figures.get((data_version, "fig_win", zeitraum), build_fig_win)
+            sp["bytes"] = perf.figure_bytes(fig_win)
+        
+        # Event Listener
+        with perf.span("chart_win", tab="insta"):
+            event_win = st.plotly_chart(fig_win, width="stretch", on_select="rerun", selection_mode="points", key="chart_win")
+        if handle_chart_selection(event_win):
+            scroll_to_anchor()
 
-        # --- TEIL 2: TABELLEN & DETAILANALYSE ---
+    with top_row_col2:
+        # Geringstes Wachstum
+        with perf.span("fig_loss", tab="insta", rows=len(df_trend)) as sp:
+            def build_fig_loss():
+                fig_loss = px.bar(
+                    df_trend.sort_values(by='Zuwachs', ascending=True).head(10), 
+                    x='Zuwachs', y='CLUB_NAME_SHORT', 
+                    orientation='h', 
+                    title=f"📉 Geringstes Wachstum seit dem {ref_day:%d.%m.%Y} (Klickbar)", 
+                    color_discrete_sequence=['#FF4B4B'], 
+                    text='Zuwachs',
+                    custom_data=['CLUB_NAME'] 
+                )
         
-        # 1. ANCHOR SETZEN
-        st.markdown("<div id='ranking_anchor'></div>", unsafe_allow_html=True)
+                # Layout aktualisieren: Zoom sperren, Interaktion beschränken
+                fig_loss.update_layout(
+                    yaxis={
+                        'categoryorder': 'total descending',
+                        'fixedrange': True  # 🔒 Verhindert Zoom auf Y-Achse
+                    },
+                    xaxis={
+                        'fixedrange': True  # 🔒 Verhindert Zoom auf X-Achse
+                    },
+                    yaxis_title=None,
+                    clickmode='event+select',
+                    dragmode=False,          # 🔒 Verhindert das Ziehen/Maus-Selektieren
+                    margin=dict(l=0, r=0, t=40, b=0)
+                )
+                fig_loss.update_traces(textposition='inside', insidetextanchor='start', textfont_color='black', textangle=-0)
+                return fig_loss
+            fig_loss = figures.get((data_version, "fig_loss", zeitraum), build_fig_loss)
+            sp["bytes"] = perf.figure_bytes(fig_loss)
         
-        row1_col1, row1_col2 = st.columns(2, gap="medium")
-        #h_tables = 2150
+        # Event Listener
+        with perf.span("chart_loss", tab="insta"):
+            event_loss = st.plotly_chart(fig_loss, width="stretch", on_select="rerun", selection_mode="points", key="chart_loss")
+        if handle_chart_selection(event_loss):
+            scroll_to_anchor()
+
+    st.divider()
+
+    # --- TEIL 2: TABELLEN & DETAILANALYSE ---
+    
+    # 1. ANCHOR SETZEN
+    st.markdown("<div id='ranking_anchor'></div>", unsafe_allow_html=True)
+    
+    row1_col1, row1_col2 = st.columns(2, gap="medium")
+    #h_tables = 2150
+    
+    with row1_col1:
+        st.subheader("🏆 Aktuelles Ranking")
         
-        with row1_col1:
-            st.subheader("🏆 Aktuelles Ranking")
-            
-            # Hinweis anzeigen
-            if st.session_state.selected_club_from_chart:
-                st.info(f"👉 Markiert: **{st.session_state.selected_club_from_chart}** (Scrollen Sie in der Liste, falls nicht sichtbar)")
-                if st.button("Markierung aufheben"):
-                    st.session_state.selected_club_from_chart = None
-                    st.rerun()
-            else:
-                st.markdown("👇 :yellow[Hier Vereine für Detailanalyse selektieren]")
-
-            # Styling Funktion: Färbt die Zeile gelb, wenn sie dem Chart-Klick entspricht
-            def highlight_selected_row(row):
-                color = ''
-                if st.session_state.selected_club_from_chart and row['CLUB_NAME'] == st.session_state.selected_club_from_chart:
-                    color = 'background-color: #ffeeba; color: black; font-weight: bold' # Helles Gelb
-                return [color] * len(row)
-
-            # Daten vorbereiten (nur Spalten, die wir anzeigen wollen)
-            df_view = df_latest_display[['RANG', 'CLUB_NAME', 'URL', 'FOLLOWER', 'STAND']]
-            
-            # Styling anwenden
-            styled_df = df_view.style.apply(highlight_selected_row, axis=1)
-                
-            selection = st.dataframe(
-                styled_df, 
+        # Hinweis anzeigen
+        if st.session_state.selected_club_from_chart:
+            st.info(f"👉 Markiert: **{st.session_state.selected_club_from_chart}**")
+            if st.button("Markierung aufheben"):
+                st.session_state.selected_club_from_chart = None
+                st.rerun(scope="fragment")
+        else:
+            st.markdown("👇 :yellow[Hier Vereine für Detailanalyse selektieren]")
+
+        # Suche und Filter laufen auf der ganzen Tabelle, gerendert wird nur eine Seite
+        filter_cols = st.columns([2, 1, 1])
+        query = filter_cols[0].text_input("Suche", key="ranking_search", placeholder="Verein oder Instagram-Name")
+        region = liga = None
+        for col, name, label, key in [(filter_cols[1], 'REGION', "Region", "ranking_region"),
+                                      (filter_cols[2], 'LIGA', "Liga", "ranking_liga")]:
+            values = sorted(v for v in df_latest_display.get(name, pd.Series(dtype=str)).unique() if v)
+            if values:
+                choice = col.selectbox(label, [ALLE] + values, key=key)
+                if choice != ALLE:
+                    region, liga = (choice, liga) if name == 'REGION' else (region, choice)
+        df_filtered = filter_ranking(df_latest_display, query, region, liga)
+
+        pages = page_count(len(df_filtered), RANKING_PAGE_SIZE)
+        if st.session_state.get("ranking_page", 1) > pages:
+            st.session_state.ranking_page = pages
+        if pages > 1:
+            page = st.number_input(f"Seite (von {pages})", min_value=1, max_value=pages, step=1, key="ranking_page")
+        else:
+            page = 1
+        df_page = page_slice(df_filtered, page, RANKING_PAGE_SIZE)
+
+        # Per Chart-Klick gewählten Verein in der Rang-Spalte markieren (ohne Styler)
+        df_view = mark_row(df_page, st.session_state.selected_club_from_chart)
+        df_view.insert(0, 'AUSWAHL', df_view['CLUB_NAME'].isin(st.session_state.ranking_selection).to_numpy())
+        df_view = df_view[['AUSWAHL', 'RANG', 'CLUB_NAME', 'URL', 'FOLLOWER', 'STAND']]
+
+        def update_selection(editor_key, page_clubs):
+            # Häkchen dieser Seite in die seitenübergreifende Auswahl übernehmen
+            selection = list(st.session_state.ranking_selection)
+            for row, changes in st.session_state[editor_key]["edited_rows"].items():
+                if 'AUSWAHL' not in changes:
+                    continue
+                club = page_clubs[int(row)]
+                if changes['AUSWAHL'] and club not in selection:
+                    selection.append(club)
+                elif not changes['AUSWAHL'] and club in selection:
+                    selection.remove(club)
+            st.session_state.ranking_selection = selection
+
+        editor_key = f"ranking_editor_{st.session_state.ranking_editor_reset}_{page}_{query}_{region}_{liga}"
+        with perf.span("table_ranking", tab="insta", rows=len(df_view)) as sp:
+            st.data_editor(
+                df_view,
                 column_config={
+                    "AUSWAHL": st.column_config.CheckboxColumn("✓", width="small"),
                     "RANG": st.column_config.TextColumn("Rang"),
                     "URL": st.column_config.LinkColumn("Instagram", display_text=r"https://www.instagram.com/([^/?#]+)"),
                     "FOLLOWER": st.column_config.TextColumn("Follower"),
                     "STAND": st.column_config.TextColumn("Stand")
                 },
+                disabled=['RANG', 'CLUB_NAME', 'URL', 'FOLLOWER', 'STAND'],
                 hide_index=True,
-                on_select="rerun",
-                selection_mode="multi-row",
-                use_container_width=True,
+                width="stretch",
+                key=editor_key,
+                on_change=update_selection,
+                args=(editor_key, df_view['CLUB_NAME'].tolist()),
                 height=(len(df_view) + 1) * 35 + 3
             )
+            sp["bytes"] = perf.frame_bytes(df_view)
+        st.caption(f"{len(df_filtered)} von {len(df_latest_display)} Vereinen"
+                   + (f" · {len(st.session_state.ranking_selection)} ausgewählt" if st.session_state.ranking_selection else ""))
+        if st.session_state.ranking_selection and st.button("Auswahl leeren"):
+            st.session_state.ranking_selection = []
+            # Sonst spielt der nächste Klick die alten edited_rows des Editors wieder ein
+            st.session_state.ranking_editor_reset += 1
+            st.rerun(scope="fragment")
+        
+    with row1_col2:
+        st.subheader("🔍 Detailanalyse")
+        
+        # 1. Manuelle Auswahl aus Tabelle (alle Seiten)
+        sel_clubs = list(st.session_state.ranking_selection)
+        
+        # 2. Automatische Auswahl durch Chart-Klick (hinzufügen, falls nicht schon da)
+        if st.session_state.selected_club_from_chart:
+             if st.session_state.selected_club_from_chart not in sel_clubs:
+                 sel_clubs.append(st.session_state.selected_club_from_chart)
+
+        if sel_clubs:
+            # plot_data = df_insta[df_insta['CLUB_NAME'].isin(sel_clubs)].sort_values(['CLUB_NAME', 'DATE'])
+            # fig_detail = px.line(plot_data, x='DATE', y='FOLLOWER', color='CLUB_NAME', title="Vergleich der Vereine", markers=True)
+            # st.plotly_chart(fig_detail, use_container_width=True)
+            # Weitere Kennzahlen aus demselben Profilabruf (Auswahl erst, wenn es dafür Werte gibt)
+            kennzahl = 'FOLLOWER'
+            if matrix.metrics:
+                kennzahl = st.selectbox("Kennzahl", ['FOLLOWER'] + matrix.metrics, key="detail_kennzahl",
+                                        format_func=lambda c: "Follower" if c == 'FOLLOWER' else metric_label(c))
+
+            # Plot erstellen (lange Historien werden vorher aggregiert und ausgedünnt)
+            # Die Figur hängt nur an Datenstand und Auswahl – gleiche Auswahl in anderen Sessions ist ein Cache-Treffer
+            with perf.span("fig_detail", tab="insta") as sp:
+                def build_fig_detail():
+                    if kennzahl == 'FOLLOWER':
+                        # Tage, an denen der Scraper einen ruhigen Account übersprungen hat, mit dem letzten Stand füllen
+                        plot_data = matrix.series(sel_clubs)
+                        title = "Vergleich der Vereine"
+                    else:
+                        # Kennzahlen nur an den Tagen, an denen sie erhoben wurden
+                        plot_data = matrix.metric_series(kennzahl, sel_clubs)
+                        title = f"Vergleich der Vereine: {metric_label(kennzahl)}"
+                    sp["rows"] = len(plot_data)
+                    fig_detail = px.line(prepare_timeseries(plot_data, y=kennzahl, group='CLUB_NAME'), x='DATE', y=kennzahl, color='CLUB_NAME', title=title, markers=True,
+                                         labels={kennzahl: metric_label(kennzahl)})
             
-        with row1_col2:
-            st.subheader("🔍 Detailanalyse")
+                    # 🛠️ Y-Achsen Puffer berechnen (damit der höchste Wert nicht oben "klebt")
+                    if not plot_data.empty:
+                        y_max = plot_data[kennzahl].max()
+                        y_min = plot_data[kennzahl].min()
+                        # Puffer berechnen (z.B. 10% der Spannweite oben draufrechnen)
+                        diff = y_max - y_min
+                        if diff == 0: diff = y_max * 0.1 or 1 # Fallback, falls alle Werte gleich sind
+                
+                        # Bereich manuell setzen: Unten etwas Luft, Oben 10% Luft für den nächsten Tick
+                        y_range = [y_min - (diff * 0.05), y_max + (diff * 0.15)]
+                        fig_detail.update_yaxes(range=y_range)
             
-            sel_clubs = []
+                    # Layout Updates
+                    fig_detail.update_layout(
+                        xaxis_title=None,       # 🚫 X-Titel ausblenden
+                        xaxis=dict(
+                            tickformat="%d.%m.%Y", # 📅 Format dd.mm.yyyy
+                            fixedrange=True        # 🔒 X-Zoom sperren
+                        ),
+                        yaxis=dict(
+                            fixedrange=True        # 🔒 Y-Zoom sperren
+                        ),
+                        dragmode=False,            # 🔒 Ziehen verhindern
+                        legend_title_text=None     # Optional: Legenden-Titel entfernen (sieht oft sauberer aus)
+                    )
             
-            # 1. Manuelle Auswahl aus Tabelle
-            if selection and selection.selection.rows:
-                sel_clubs = df_latest_display.iloc[selection.selection.rows]['CLUB_NAME'].tolist()
+                    # Marker dürfen über die Achsen hinausgehen (verhindert halbe Kreise am Rand)
+                    fig_detail.update_traces(cliponaxis=False)
+                    return fig_detail
+                fig_detail = figures.get((data_version, "fig_detail", (kennzahl, tuple(sorted(sel_clubs)))), build_fig_detail)
+                sp["bytes"] = perf.figure_bytes(fig_detail)
             
-            # 2. Automatische Auswahl durch Chart-Klick (hinzufügen, falls nicht schon da)
-            if st.session_state.selected_club_from_chart:
-                 if st.session_state.selected_club_from_chart not in sel_clubs:
-                     sel_clubs.append(st.session_state.selected_club_from_chart)
-
-            if sel_clubs:
-                # plot_data = df_insta[df_insta['CLUB_NAME'].isin(sel_clubs)].sort_values(['CLUB_NAME', 'DATE'])
-                # fig_detail = px.line(plot_data, x='DATE', y='FOLLOWER', color='CLUB_NAME', title="Vergleich der Vereine", markers=True)
-                # st.plotly_chart(fig_detail, use_container_width=True)
-                # Daten vorbereiten
-                plot_data = df_insta[df_insta['CLUB_NAME'].isin(sel_clubs)].sort_values(['CLUB_NAME', 'DATE'])
-                
-                # Plot erstellen
-                fig_detail = px.line(plot_data, x='DATE', y='FOLLOWER', color='CLUB_NAME', title="Vergleich der Vereine", markers=True)
-                
-                # 🛠️ Y-Achsen Puffer berechnen (damit der höchste Wert nicht oben "klebt")
-                if not plot_data.empty:
-                    y_max = plot_data['FOLLOWER'].max()
-                    y_min = plot_data['FOLLOWER'].min()
-                    # Puffer berechnen (z.B. 10% der Spannweite oben draufrechnen)
-                    diff = y_max - y_min
-                    if diff == 0: diff = y_max * 0.1 # Fallback, falls alle Werte gleich sind
-                    
-                    # Bereich manuell setzen: Unten etwas Luft, Oben 10% Luft für den nächsten Tick
-                    y_range = [y_min - (diff * 0.05), y_max + (diff * 0.15)]
-                    fig_detail.update_yaxes(range=y_range)
-                
-                # Layout Updates
-                fig_detail.update_layout(
-                    xaxis_title=None,       # 🚫 X-Titel ausblenden
-                    xaxis=dict(
-                        tickformat="%d.%m.%Y", # 📅 Format dd.mm.yyyy
-                        fixedrange=True        # 🔒 X-Zoom sperren
-                    ),
-                    yaxis=dict(
-                        fixedrange=True        # 🔒 Y-Zoom sperren
-                    ),
-                    dragmode=False,            # 🔒 Ziehen verhindern
-                    legend_title_text=None     # Optional: Legenden-Titel entfernen (sieht oft sauberer aus)
-                )
-                
-                # Marker dürfen über die Achsen hinausgehen (verhindert halbe Kreise am Rand)
-                fig_detail.update_traces(cliponaxis=False)
-                
-                # Anzeigen mit Konfiguration
+            # Anzeigen mit Konfiguration
+            with perf.span("chart_detail", tab="insta"):
                 st.plotly_chart(
                     fig_detail, 
-                    use_container_width=True,
+                    width="stretch",
                     config={
                         'displayModeBar': True, # ✅ Toolbar bleibt an (für Download)
                         'scrollZoom': False,    # 🚫 Mausrad deaktivieren
@@ -323,24 +492,64 @@ with tab_insta:
                         ]
                     }
                 )
-            else: 
-                st.info("💡 Klicke links in der Tabelle auf Zeilen oder oben auf das Diagramm, um den Verlauf zu sehen.")
-        
-        st.divider()
-        
-        # --- TEIL 3: GESAMTENTWICKLUNG ---
-        st.subheader("🌐 Gesamtentwicklung Deutschland")
-        st.markdown(f"##### Deutschland gesamt: :yellow[**{summe_follower}**]")
-        fig_total = px.line(df_insta.groupby('DATE')['FOLLOWER'].sum().reset_index(), x='DATE', y='FOLLOWER', title="Summe aller Follower", markers=True, color_discrete_sequence=['#FFB200']).update_yaxes(tickformat=',d')
-        st.plotly_chart(fig_total, use_container_width=True, config={'staticPlot': True})
+        else: 
+            st.info("💡 Klicke links in der Tabelle auf Zeilen oder oben auf das Diagramm, um den Verlauf zu sehen.")
 
-    else: 
-        st.error("Instagram-Daten konnten nicht geladen werden.")
+    perf.flush()
 
 
+def render_insta_gesamt():
+    # --- TEIL 3: GESAMTENTWICKLUNG ---
+    st.subheader("🌐 Gesamtentwicklung Deutschland")
+    st.markdown(f"##### Deutschland gesamt: :yellow[**{summe_follower}**]")
+    df_total = insta_aggregates['national_total'] if insta_aggregates else matrix.totals()
+    with perf.span("fig_total", tab="insta", rows=len(df_total)) as sp:
+        fig_total = get_figure_cache().get(
+            (data_version, "fig_total"),
+            lambda: px.line(prepare_timeseries(df_total), x='DATE', y='FOLLOWER', title="Summe aller Follower", markers=True, color_discrete_sequence=['#FFB200']).update_yaxes(tickformat=',d'),
+        )
+        sp["bytes"] = perf.figure_bytes(fig_total)
+    with perf.span("chart_total", tab="insta"):
+        st.plotly_chart(fig_total, width="stretch", config={'staticPlot': True})
 
 
+@st.fragment
+def render_zuschauer():
+    # Erst importieren und laden, wenn der Reiter wirklich geöffnet ist
+    from zuschauer_tab import render_zuschauer_tab
+    with perf.span("load_data", tab="zuschauer") as sp:
+        model, model_stamp = load_zuschauer_model()
+        sp["rows"] = len(model.matches) if model is not None else 0
+    figures = get_figure_cache()
+    with perf.span("render", tab="zuschauer"):
+        render_zuschauer_tab(model, figure=lambda kind, selection, build: figures.get((model_stamp, kind, selection), build))
+    perf.flush()
 
+# ==========================================
+# 3. REITER / TABS
+# ==========================================
+# Nur der geöffnete Reiter wird ausgeführt
+tab_insta, tab_zuschauer = st.tabs(["📸 Instagram Follower", "🏟️ Bundesliga Zuschauer"], key="hauptreiter", on_change="rerun")
 
+# --- TAB 1: INSTAGRAM ---
+with tab_insta:
+    if tab_insta.open:
+        if not matrix.empty:
+            render_insta_interaktiv()
+            st.divider()
+            render_insta_gesamt()
+        else: 
+            st.error("Instagram-Daten konnten nicht geladen werden.")
 
+# --- TAB 2: ZUSCHAUER ---
+with tab_zuschauer:
+    # Ohne Freigabe bleibt der Reiter leer wie bisher – kein Laden des Zuschauer-Sheets
+    if ZUSCHAUER_TAB and tab_zuschauer.open:
+        render_zuschauer()
 
+# --- PERFORMANCE (versteckt, Aufruf mit ?perf=1) ---
+if show_perf:
+    with st.expander("⏱️ Performance", expanded=False):
+        st.dataframe(perf.as_frame(), hide_index=True, width="stretch")
+        st.caption("Figure-Cache: {entries} Charts, {bytes:,} Bytes, {hits} Treffer / {misses} neu gebaut".format(**get_figure_cache().stats()))
+perf.flush()
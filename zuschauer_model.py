@@ -0,0 +1,93 @@
+import pandas as pd
+
+from presentation import match_labels
+
+UNBEKANNT = "Unbekannt"
+SAISON_FARBEN = ['#0047AB', '#FFC000']
+
+
+def season_labels(datum):
+    """Saison "JJJJ/JJJJ" (Start am 1. Juli) – vektorisiert über die ganze Spalte."""
+    year = datum.dt.year
+    start = year.where(datum.dt.month >= 7, year - 1)
+    label = start.astype('Int64').astype(str) + "/" + (start + 1).astype('Int64').astype(str)
+    return label.where(datum.notna(), UNBEKANNT)
+
+
+class AttendanceModel:
+    """Aufbereitete Zuschauerdaten – einmal pro Datenstand gebaut, danach nur noch gelesen.
+
+    Enthält die bereinigten Spiele (HEIM/SAISON als Kategorien), die Saison-
+    und Spieltagstabellen für die Liga-Ansicht und pro Verein die fertigen
+    Tabellen für die Vereinsansicht. Ein Vereinswechsel im Dashboard ist damit
+    ein Dict-Zugriff statt eines Filters über alle Spiele.
+    """
+
+    def __init__(self, df_z):
+        df_z = df_z.copy()
+        df_z['ZUSCHAUER'] = pd.to_numeric(df_z['ZUSCHAUER'], errors='coerce')
+        df_z = df_z[df_z['ZUSCHAUER'] > 0].copy()
+
+        if 'DATUM' in df_z.columns:
+            df_z['DATUM'] = pd.to_datetime(df_z['DATUM'], dayfirst=True, errors='coerce')
+        if 'AVERAGE_SPIELTAG' in df_z.columns:
+            df_z['AVERAGE_SPIELTAG'] = pd.to_numeric(df_z['AVERAGE_SPIELTAG'], errors='coerce').fillna(0)
+
+        if 'SAISON' not in df_z.columns and 'SEASON' in df_z.columns:
+            df_z['SAISON'] = df_z['SEASON']
+        elif 'SAISON' not in df_z.columns:
+            df_z['SAISON'] = season_labels(df_z['DATUM'])
+        df_z['SAISON'] = df_z['SAISON'].astype(str).astype('category')
+        if 'HEIM' in df_z.columns:
+            df_z['HEIM'] = df_z['HEIM'].astype(str).astype('category')
+        self.matches = df_z
+
+        self.seasons = sorted(s for s in df_z['SAISON'].cat.categories if s != UNBEKANNT)
+        self.color_map = {s: SAISON_FARBEN[i % 2] for i, s in enumerate(self.seasons)}
+        self.clubs = sorted(df_z['HEIM'].cat.categories) if 'HEIM' in df_z.columns else []
+
+        self.season_table = self._build_season_table()
+        self.matchday_table = self._build_matchday_table()
+        self._club_tables = {club: self._build_club_tables(rows) for club, rows in self._club_groups()}
+
+    @property
+    def empty(self):
+        return self.matches.empty
+
+    def _build_season_table(self):
+        df_saison = self.matches.groupby('SAISON', observed=True)['ZUSCHAUER'].mean().reset_index()
+        df_saison['SAISON'] = df_saison['SAISON'].astype(str)
+        df_saison['COLOR'] = [['#FFD700', '#0057B8'][i % 2] for i in range(len(df_saison))]
+        return df_saison
+
+    def _build_matchday_table(self):
+        cols = ["DATUM", 'SAISON', 'SPIELTAG', 'AVERAGE_SPIELTAG']
+        df_helper = self.matches[[c for c in cols if c in self.matches.columns]].copy()
+        if not {'SAISON', 'SPIELTAG', 'AVERAGE_SPIELTAG'} <= set(df_helper.columns):
+            return pd.DataFrame()
+        df_helper['SAISON'] = df_helper['SAISON'].astype(str)
+        df_helper = df_helper.drop_duplicates(subset=['SAISON', 'SPIELTAG']).sort_values('DATUM')
+        # Zwei Spieltage am selben Datum würden auf der Kategorie-Achse verschmelzen
+        ist_doppelt = df_helper.duplicated(subset=['DATUM'], keep='first')
+        df_helper.loc[ist_doppelt, 'DATUM'] = df_helper.loc[ist_doppelt, 'DATUM'] - pd.Timedelta(days=1)
+        return df_helper
+
+    def _club_groups(self):
+        if not self.clubs:
+            return []
+        # Positionsindex pro Verein, einmal über alle Spiele berechnet
+        indices = self.matches.groupby('HEIM', observed=True).indices
+        return [(club, self.matches.iloc[pos]) for club, pos in indices.items()]
+
+    @staticmethod
+    def _build_club_tables(team_data):
+        team_data = team_data.sort_values('DATUM').astype({'HEIM': str, 'SAISON': str})
+        stats_saison = team_data.groupby('SAISON')['ZUSCHAUER'].mean().reset_index()
+        stats_saison.columns = ['Saison', 'Ø Zuschauer']
+        stats_saison['Ø Zuschauer'] = stats_saison['Ø Zuschauer'].round(0).astype(int)
+        team_data['X_LABEL'] = match_labels(team_data)
+        return team_data, stats_saison
+
+    def club(self, name):
+        """(Heimspiele, Saisonschnitt) eines Vereins – O(1)-Lookup."""
+        return self._club_tables[name]
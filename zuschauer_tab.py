@@ -1,42 +1,32 @@
-# --- TAB 2: ZUSCHAUER ---
-with tab_zuschauer:
-    df_z = load_data(ZUSCHAUER_SHEET_ID, "gcp_service_account")
-    df_z['ZUSCHAUER'] = pd.to_numeric(df_z['ZUSCHAUER'], errors='coerce')
-    df_z = df_z[df_z['ZUSCHAUER'] > 0]
+import plotly.express as px
+import streamlit as st
 
-    if not df_z.empty:
-        if 'DATUM' in df_z.columns:
-            df_z['DATUM'] = pd.to_datetime(df_z['DATUM'], dayfirst=True, errors='coerce')
-        if 'ZUSCHAUER' in df_z.columns:
-            df_z['ZUSCHAUER'] = pd.to_numeric(df_z['ZUSCHAUER'], errors='coerce').fillna(0)
-        if 'AVERAGE_SPIELTAG' in df_z.columns:
-            df_z['AVERAGE_SPIELTAG'] = pd.to_numeric(df_z['AVERAGE_SPIELTAG'], errors='coerce').fillna(0)
 
+def _build(kind, selection, build):
+    return build()
 
-        def get_season(d):
-            if pd.isnull(d): return "Unbekannt"
-            return f"{d.year}/{d.year + 1}" if d.month >= 7 else f"{d.year - 1}/{d.year}"
 
+def render_zuschauer_tab(model, figure=_build):
+    """Reiter "Bundesliga Zuschauer" auf Basis des vorberechneten AttendanceModel.
 
-        if 'SAISON' not in df_z.columns and 'SEASON' in df_z.columns:
-            df_z['SAISON'] = df_z['SEASON']
-        elif 'SAISON' not in df_z.columns:
-            df_z['SAISON'] = df_z['DATUM'].apply(get_season)
+    `figure(kind, selection, build)` liefert die Figur eines Charts – das Dashboard
+    reicht hier den FigureCache durch, ohne Cache wird einfach `build()` aufgerufen.
+    """
+    if model is None or model.empty:
+        st.error("Zuschauer-Daten konnten nicht geladen werden.")
+        return
 
-        unique_seasons = sorted([s for s in df_z['SAISON'].unique() if s != "Unbekannt"])
-        color_map = {s: ('#0047AB' if i % 2 == 0 else '#FFC000') for i, s in enumerate(unique_seasons)}
+    color_map = model.color_map
 
-        if 'HEIM' in df_z.columns:
-            options_list = ["🇩🇪 Liga-Gesamtentwicklung (Spieltag-Schnitt)"] + sorted(df_z['HEIM'].unique())
-            auswahl = st.selectbox("## Wähle einen Verein aus:", options_list, key="vereins_auswahl")
+    if model.clubs:
+        options_list = ["🇩🇪 Liga-Gesamtentwicklung (Spieltag-Schnitt)"] + model.clubs
+        auswahl = st.selectbox("## Wähle einen Verein aus:", options_list, key="vereins_auswahl")
 
-            if "Liga-Gesamtentwicklung" in auswahl:
-                df_saison = df_z.groupby('SAISON')['ZUSCHAUER'].mean().reset_index()
-
-                if not df_saison.empty:
-                    farben_liste = ['#FFD700', '#0057B8']
-                    df_saison['COLOR'] = [farben_liste[i % 2] for i in range(len(df_saison))]
+        if "Liga-Gesamtentwicklung" in auswahl:
+            df_saison = model.season_table
 
+            if not df_saison.empty:
+                def build_fig_saison():
                     fig_saison = px.bar(
                         df_saison,
                         x='SAISON',
@@ -61,18 +51,15 @@ with tab_zuschauer:
                         ),
                         hovermode="x unified"
                     )
-                    st.plotly_chart(fig_saison, use_container_width=True)
-
-                cols = ["DATUM", 'SAISON', 'SPIELTAG', 'AVERAGE_SPIELTAG']
-                df_helper = df_z[[c for c in cols if c in df_z.columns]].copy()
+                    return fig_saison
 
-                df_helper = df_helper.drop_duplicates(subset=['SAISON', 'SPIELTAG']).sort_values('DATUM')
+                fig_saison = figure("saison", None, build_fig_saison)
+                st.plotly_chart(fig_saison, width="stretch")
 
-                df_helper['DATUM'] = pd.to_datetime(df_helper['DATUM'])
-                ist_doppelt = df_helper.duplicated(subset=['DATUM'], keep='first')
-                df_helper.loc[ist_doppelt, 'DATUM'] = df_helper.loc[ist_doppelt, 'DATUM'] - pd.Timedelta(days=1)
+            df_helper = model.matchday_table
 
-                if not df_helper.empty:
+            if not df_helper.empty:
+                def build_fig_trend():
                     fig_trend = px.bar(
                         df_helper,
                         x='DATUM',
@@ -98,19 +85,19 @@ with tab_zuschauer:
                     )
 
                     fig_trend.update_traces(textposition='outside')
-                    st.plotly_chart(fig_trend, use_container_width=True)
+                    return fig_trend
 
-                else:
-                    st.warning("Die erforderlichen Spalten (SAISON, SPIELTAG, AVERAGE_SPIELTAG) fehlen im Datensatz.")
+                fig_trend = figure("spieltag", None, build_fig_trend)
+                st.plotly_chart(fig_trend, width="stretch")
 
             else:
-                team_data = df_z[df_z['HEIM'] == auswahl].sort_values('DATUM')
-                st.markdown(f"### Entwicklung: {auswahl}")
+                st.warning("Die erforderlichen Spalten (SAISON, SPIELTAG, AVERAGE_SPIELTAG) fehlen im Datensatz.")
 
-                stats_saison = team_data.groupby('SAISON')['ZUSCHAUER'].mean().reset_index()
-                stats_saison.columns = ['Saison', 'Ø Zuschauer']
-                stats_saison['Ø Zuschauer'] = stats_saison['Ø Zuschauer'].round(0).astype(int)
+        else:
+            team_data, stats_saison = model.club(auswahl)
+            st.markdown(f"### Entwicklung: {auswahl}")
 
+            def build_fig_avg():
                 fig_avg = px.bar(stats_saison, x='Saison', y='Ø Zuschauer', text='Ø Zuschauer',
                                  title=f"Durchschnittliche Zuschauer pro Saison",
                                  color='Saison', color_discrete_map=color_map)
@@ -125,11 +112,12 @@ with tab_zuschauer:
                     ),
                     margin=dict(b=100)
                 )
-                st.plotly_chart(fig_avg, use_container_width=True)
+                return fig_avg
 
-                team_data['X_LABEL'] = team_data.apply(
-                    lambda x: f"{x['DATUM'].strftime('%d.%m.%Y')} (ST {str(x['SPIELTAG']).replace('.0', '')})", axis=1)
+            fig_avg = figure("club_avg", auswahl, build_fig_avg)
+            st.plotly_chart(fig_avg, width="stretch")
 
+            def build_fig_team():
                 fig_team = px.bar(team_data, x='X_LABEL', y='ZUSCHAUER', text='ZUSCHAUER',
                                   color='SAISON', color_discrete_map=color_map,
                                   title=f"Alle Heimspiele von {auswahl}")
@@ -142,7 +130,7 @@ with tab_zuschauer:
                     yaxis=dict(fixedrange=True, nticks=10, exponentformat="none"),
                     margin=dict(b=100)
                 )
+                return fig_team
 
-                st.plotly_chart(fig_team, use_container_width=True)
-    else:
-        st.error("Zuschauer-Daten konnten nicht geladen werden.")
\ No newline at end of file
+            fig_team = figure("club_team", auswahl, build_fig_team)
+            st.plotly_chart(fig_team, width="stretch")